@@ -0,0 +1,163 @@
+"""
+Multipart bodies for the benchmarks, generated locally from a fixed seed.
+
+Each corpus is a Corpus tuple. chunks() returns a fresh iterable of the
+chunks to feed the parser, so a corpus can be run more than once. Small
+corpora are split up ahead of time, so the split isn't part of what is
+timed. The large file corpus is generated as it is read, so that it never
+has to fit in memory.
+"""
+
+import random
+from collections import namedtuple
+
+
+BOUNDARY = b"----WebKitFormBoundary7MA4YWxkTrZu0gW"
+SEPARATOR = b"--" + BOUNDARY
+TERMINATOR = b"--" + BOUNDARY + b"--"
+
+BLOCK_SIZE = 2 ** 16
+
+Corpus = namedtuple("Corpus", "name description boundary size chunks")
+
+
+def _field(name, value):
+    return (
+        SEPARATOR + b"\r\n"
+        b'Content-Disposition: form-data; name="' + name + b'"\r\n'
+        b"\r\n" + value + b"\r\n"
+    )
+
+
+def _file_head(name, filename):
+    return (
+        SEPARATOR + b"\r\n"
+        b'Content-Disposition: form-data; name="'
+        + name
+        + b'"; filename="'
+        + filename
+        + b'"\r\n'
+        b"Content-Type: application/octet-stream\r\n"
+        b"\r\n"
+    )
+
+
+def _random_block(rng, size):
+    """ Random bytes that don't contain the separator. """
+    while True:
+        block = bytes(rng.getrandbits(8) for _ in range(size))
+        if SEPARATOR not in block:
+            return block
+
+
+def _split(body, size):
+    return [body[i : i + size] for i in range(0, len(body), size)]
+
+
+def _presplit(name, description, body, chunks):
+    return Corpus(name, description, BOUNDARY, len(body), lambda: chunks)
+
+
+def many_small_fields(scale=1.0):
+    count = max(int(20000 * scale), 1)
+    body = b"".join(
+        _field(b"field_%d" % i, b"value %d" % i) for i in range(count)
+    ) + TERMINATOR + b"\r\n"
+    return _presplit(
+        "many_small_fields",
+        "%d short text fields, %d byte chunks" % (count, BLOCK_SIZE),
+        body,
+        _split(body, BLOCK_SIZE),
+    )
+
+
+def large_file(scale=1.0):
+    block_count = max(int(2 ** 30 * scale) // BLOCK_SIZE, 1)
+    head = _file_head(b"upload", b"upload.bin")
+    tail = b"\r\n" + TERMINATOR + b"\r\n"
+    block = _random_block(random.Random(1), BLOCK_SIZE)
+
+    def chunks():
+        yield head
+        for _ in range(block_count):
+            yield block
+        yield tail
+
+    return Corpus(
+        "large_file",
+        "one %d MiB binary file, %d byte chunks"
+        % (block_count * BLOCK_SIZE // 2 ** 20, BLOCK_SIZE),
+        BOUNDARY,
+        len(head) + block_count * BLOCK_SIZE + len(tail),
+        chunks,
+    )
+
+
+def near_misses(scale=1.0):
+    # Every line looks like the start of a delimiter, until its last byte.
+    near_miss = b"\r\n" + SEPARATOR[:-1] + b"X"
+    count = max(int(2 ** 24 * scale) // len(near_miss), 1)
+    body = (
+        _file_head(b"upload", b"near_misses.bin")
+        + near_miss * count
+        + b"\r\n"
+        + TERMINATOR
+        + b"\r\n"
+    )
+    return _presplit(
+        "near_misses",
+        "binary file made of %d delimiter near misses" % count,
+        body,
+        _split(body, BLOCK_SIZE),
+    )
+
+
+def bytewise_headers(scale=1.0):
+    count = max(int(200 * scale), 1)
+    body = b"".join(
+        SEPARATOR + b"\r\n"
+        b'Content-Disposition: form-data; name="field_%d"\r\n'
+        b"Content-Type: text/plain; charset=utf-8\r\n"
+        b"X-Padding: %s\r\n"
+        b"\r\n"
+        b"value\r\n" % (i, b"x" * 256)
+        for i in range(count)
+    ) + TERMINATOR + b"\r\n"
+    return _presplit(
+        "bytewise_headers",
+        "%d parts with ~350 byte headers, 1 byte chunks" % count,
+        body,
+        _split(body, 1),
+    )
+
+
+def random_chunks(scale=1.0):
+    rng = random.Random(2)
+    parts = []
+    for i in range(max(int(50 * scale), 1)):
+        if i % 2:
+            parts.append(_field(b"field_%d" % i, b"x" * rng.randrange(1000)))
+        else:
+            parts.append(
+                _file_head(b"file_%d" % i, b"file_%d.bin" % i)
+                + _random_block(rng, rng.randrange(200000))
+                + b"\r\n"
+            )
+    body = b"".join(parts) + TERMINATOR + b"\r\n"
+
+    chunks = []
+    position = 0
+    while position < len(body):
+        size = rng.randrange(1, 2 * BLOCK_SIZE)
+        chunks.append(body[position : position + size])
+        position += size
+
+    return _presplit(
+        "random_chunks",
+        "files and fields, random chunk sizes up to %d bytes" % (2 * BLOCK_SIZE),
+        body,
+        chunks,
+    )
+
+
+CORPORA = [many_small_fields, large_file, near_misses, bytewise_headers, random_chunks]
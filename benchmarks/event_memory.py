@@ -0,0 +1,37 @@
+"""
+Measure the memory each Part and PartData event takes, by parsing a form
+of many small fields and keeping every event alive under tracemalloc.
+
+    python -m benchmarks.event_memory
+"""
+
+import tracemalloc
+
+from sansio_multipart import MultipartParser, Part, PartData
+
+from .corpora import many_small_fields
+
+
+def main():
+    corpus = many_small_fields(0.5)
+    chunks = list(corpus.chunks())
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+
+    parser = MultipartParser(corpus.boundary)
+    events = []
+    for chunk in chunks:
+        parser.recv(chunk)
+        events.extend(e for e in parser if isinstance(e, (Part, PartData)))
+
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    parts = sum(1 for e in events if isinstance(e, Part))
+    print("{} parts, {} PartData events".format(parts, len(events) - parts))
+    print("{:.0f} bytes per field (Part, headers and PartData)".format(used / parts))
+
+
+if __name__ == "__main__":
+    main()
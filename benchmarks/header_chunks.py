@@ -0,0 +1,55 @@
+"""
+Time feeding a part's headers to the parser one byte at a time.
+
+Headers are buffered incrementally, so the cost per byte should stay flat
+as the headers grow. A quadratic re-parse shows up as the cost per byte
+doubling with each doubling of the header size.
+
+    python -m benchmarks.header_chunks
+"""
+
+import time
+
+from sansio_multipart import MultipartParser
+
+
+BOUNDARY = b"8banana133744910kmmr13a56!102!2405"
+
+
+def make_body(header_size):
+    padding = b"x" * max(header_size - 100, 0)
+    return (
+        b"--" + BOUNDARY + b"\r\n"
+        b'Content-Disposition: form-data; name="field"\r\n'
+        b"X-Padding: " + padding + b"\r\n"
+        b"\r\n"
+        b"value\r\n"
+        b"--" + BOUNDARY + b"--\r\n"
+    )
+
+
+def feed_bytewise(body):
+    chunks = [body[i : i + 1] for i in range(len(body))]
+
+    start = time.perf_counter()
+    parser = MultipartParser(BOUNDARY)
+    for chunk in chunks:
+        parser.recv(chunk)
+        parser.parts()
+    return time.perf_counter() - start
+
+
+def main():
+    print("{:>12} {:>12} {:>14}".format("header bytes", "seconds", "ns per byte"))
+    for header_size in (1024, 2048, 4096, 8192, 16384, 32768):
+        body = make_body(header_size)
+        elapsed = min(feed_bytewise(body) for _ in range(3))
+        print(
+            "{:>12} {:>12.4f} {:>14.1f}".format(
+                header_size, elapsed, elapsed / len(body) * 1e9
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Measure MultipartParser throughput, events per second and peak memory over
+the corpora in benchmarks.corpora, and write the results out as JSON.
+
+    python -m benchmarks.run --output results.json
+    python -m benchmarks.run --scale 0.01 --only large_file
+
+--scale shrinks or grows every corpus, 1.0 includes a 1 GiB upload. Each
+corpus is timed --repeat times and the fastest run kept. Peak memory is
+measured in a separate run under tracemalloc, as tracing slows parsing
+down a lot. Compare results files from different releases to catch
+performance regressions.
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+import sansio_multipart
+from sansio_multipart import MultipartParser, Events
+
+from .corpora import CORPORA
+
+
+def parse_corpus(corpus) -> int:
+    """ Parse the corpus, returning the number of Part / PartData events. """
+    parser = MultipartParser(corpus.boundary)
+    events = 0
+
+    for chunk in corpus.chunks():
+        parser.recv(chunk)
+        for event in parser:
+            if not isinstance(event, Events):
+                events += 1
+
+    if parser.state is not parser.state.FINISHED:
+        raise RuntimeError("%s did not parse to completion." % corpus.name)
+
+    return events
+
+
+def peak_memory(corpus) -> int:
+    tracemalloc.start()
+    try:
+        parse_corpus(corpus)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run_corpus(corpus, repeat, memory=True) -> dict:
+    seconds = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        events = parse_corpus(corpus)
+        seconds = min(seconds, time.perf_counter() - start)
+
+    return {
+        "description": corpus.description,
+        "bytes": corpus.size,
+        "chunks": sum(1 for _ in corpus.chunks()),
+        "events": events,
+        "seconds": seconds,
+        "mb_per_s": corpus.size / seconds / 1e6,
+        "events_per_s": events / seconds,
+        "peak_memory_bytes": peak_memory(corpus) if memory else None,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--output", help="Write JSON results to this file.")
+    parser.add_argument("--scale", type=float, default=1.0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--only", action="append", help="Only run this corpus.")
+    parser.add_argument(
+        "--no-memory", action="store_true", help="Skip peak memory measurements."
+    )
+    args = parser.parse_args(argv)
+
+    results = {
+        "version": sansio_multipart.__version__,
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "scale": args.scale,
+        "corpora": {},
+    }
+
+    for make_corpus in CORPORA:
+        if args.only and make_corpus.__name__ not in args.only:
+            continue
+        corpus = make_corpus(args.scale)
+        result = run_corpus(corpus, args.repeat, memory=not args.no_memory)
+        results["corpora"][corpus.name] = result
+        print(
+            "{:<18} {:>10.1f} MB/s {:>12.0f} events/s {:>12} peak bytes".format(
+                corpus.name,
+                result["mb_per_s"],
+                result["events_per_s"],
+                str(result["peak_memory_bytes"]),
+            ),
+            file=sys.stderr,
+        )
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,9 +3,44 @@ __version__ = "0.3"
 __license__ = "MIT"
 
 
-from .parser import MultipartParser, Part, PartData, Events
+from importlib import import_module
+
+from .parser import (
+    MultipartParser,
+    MultipartCallbackParser,
+    Part,
+    PartData,
+    Events,
+    ReadHint,
+    parse_part_headers,
+)
+from .index import index_parts, PartIndex
+from .byteranges import ByteRangesParser, RangePart, RangeData
+from .sinks import SpooledSink, RangeFileSink
+from .rewriter import MultipartRewriter
+from .encoder import MultipartEncoder, FileSegment
+from .urlencoded import URLEncodedParser, Field
 from .wsgi_form_parser import parse_form_data
+from .aio import aparse
 
 
 NEED_DATA = Events.NEED_DATA
 FINISHED = Events.FINISHED
+
+
+# These pull in threads, processes and shared memory, which are slow to
+# import and missing on some platforms, so are only imported when used.
+_LAZY = {
+    "PartPipeline": "pipeline",
+    "parse_many": "batch",
+    "BatchResult": "batch",
+    "sniff_boundary": "batch",
+}
+
+
+def __getattr__(name):
+    if name not in _LAZY:
+        raise AttributeError("module %r has no attribute %r" % (__name__, name))
+    value = getattr(import_module("." + _LAZY[name], __name__), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,90 @@
+__all__ = ["aparse"]
+
+
+from typing import AsyncGenerator, Union
+
+from .parser import MultipartParser, Part, PartData, Events
+from .errors import UnexpectedExit
+
+
+async def aparse(
+    source, boundary, content_length=None, block_size=2 ** 16, **kwargs
+) -> AsyncGenerator[Union[Part, PartData], None]:
+    """
+    Parse a multipart body from source, yielding Part and PartData events.
+
+    source is either an ASGI receive callable, or anything with an
+    asyncio.StreamReader style read coroutine. Bytes are only read from it
+    when the parser needs data, and the events for the last read have all
+    been consumed. A slow consumer slows down reading, rather than letting
+    events pile up in the parser. Reads from a StreamReader are sized by
+    the parser's read_hint for block_size. Other keyword arguments are
+    passed on to MultipartParser.
+
+        async for event in aparse(receive, boundary):
+            ...
+    """
+    if hasattr(source, "read"):
+        read = _stream_reader(source, content_length)
+    else:
+        read = _asgi_reader(source)
+
+    parser = MultipartParser(boundary, content_length, **kwargs)
+
+    while True:
+        event = parser.next_event()
+
+        if event is Events.NEED_DATA:
+            chunk = await read(parser.read_hint(block_size).suggested)
+            if not chunk:
+                raise UnexpectedExit("Unexpected end of request body.")
+            parser.recv(chunk)
+
+        elif event is Events.FINISHED:
+            return
+
+        else:
+            yield event
+
+
+def _stream_reader(stream, content_length):
+    """
+    Return a coroutine function reading a chunk of up to size bytes from
+    stream, never reading past content_length bytes in total (if given).
+    """
+    remaining = -1 if content_length is None else content_length
+
+    async def read(size) -> bytes:
+        nonlocal remaining
+        if remaining < 0:
+            return await stream.read(size)
+
+        chunk = await stream.read(min(size, remaining))
+        remaining -= len(chunk)
+        return chunk
+
+    return read
+
+
+def _asgi_reader(receive):
+    """
+    Return a coroutine function reading the next non empty chunk of the
+    request body from ASGI receive, or b"" once the body is complete. ASGI
+    decides the size of chunks, so size is ignored.
+    """
+    more_body = True
+
+    async def read(size) -> bytes:
+        nonlocal more_body
+        while more_body:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                raise UnexpectedExit("Client disconnected.")
+
+            more_body = message.get("more_body", False)
+            body = message.get("body", b"")
+            if body:
+                return body
+        return b""
+
+    return read
@@ -0,0 +1,165 @@
+__all__ = ["parse_many", "BatchResult", "sniff_boundary"]
+
+
+import mmap
+import os
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+
+from typing import Generator
+
+from .index import index_parts
+from .errors import MalformedData
+
+
+BatchResult = namedtuple("BatchResult", "index item parts error")
+BatchResult.__doc__ = """
+The outcome of indexing one item given to parse_many. parts is a list of
+PartIndex, with offsets into the item, or None if error is set.
+"""
+
+
+def sniff_boundary(data) -> bytes:
+    """
+    Return the boundary of a multipart body from its first separator line.
+    """
+    with memoryview(data) as view:
+        head = bytes(view[:4096]).lstrip(b"\r\n")
+    line, newline, _ = head.partition(b"\n")
+    line = line.rstrip(b"\r")
+    if not newline or not line.startswith(b"--") or len(line) < 3:
+        raise MalformedData("Body does not start with a separator line.")
+    return line[2:]
+
+
+def _index_source(source, boundary, block_size, kwargs):
+    if boundary is None:
+        boundary = sniff_boundary(source)
+    return index_parts(source, boundary, block_size=block_size, **kwargs)
+
+
+def _index_item(kind, ref, size, boundary, block_size, kwargs):
+    """
+    Index one item in a worker process. Returns (parts, error), so that a
+    bad item doesn't stop the batch.
+    """
+    try:
+        if kind == "path":
+            with open(ref, "rb") as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    raise MalformedData("Body is empty.")
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as body:
+                    return _index_source(body, boundary, block_size, kwargs), None
+
+        shm = SharedMemory(ref)
+        try:
+            with shm.buf[:size] as body:
+                return _index_source(body, boundary, block_size, kwargs), None
+        finally:
+            shm.close()
+    except Exception as e:
+        return None, e
+
+
+def _submit(executor, item, boundary, block_size, kwargs):
+    """
+    Start indexing item. Buffers are handed to the worker through shared
+    memory rather than pickled. Returns the future, and the shared memory
+    to free once it is done.
+    """
+    if isinstance(item, (str, os.PathLike)):
+        future = executor.submit(
+            _index_item, "path", item, 0, boundary, block_size, kwargs
+        )
+        return future, None
+
+    with memoryview(item) as view:
+        size = view.nbytes
+        shm = SharedMemory(create=True, size=max(size, 1))
+        shm.buf[:size] = view.cast("B")
+    future = executor.submit(
+        _index_item, "shm", shm.name, size, boundary, block_size, kwargs
+    )
+    return future, shm
+
+
+def parse_many(
+    items,
+    workers=None,
+    ordered=True,
+    boundary=None,
+    block_size=2 ** 20,
+    **kwargs
+) -> Generator[BatchResult, None, None]:
+    """
+    Index many complete multipart bodies across a pool of worker processes,
+    yielding a BatchResult for each.
+
+    items are paths to files holding a body, or bytes-like buffers. Each is
+    scanned with index_parts in a worker, and only the compact index comes
+    back, so the caller reads part bodies out of its own buffer, or an mmap
+    of the file, with PartIndex.body. Buffers reach the workers through
+    shared memory.
+
+    With ordered, results come in the order of items. Otherwise, they come
+    as soon as they are done. An item that fails to parse gives a result
+    with the exception as error, and the rest of the batch carries on.
+
+    boundary is used for every item if given, and sniffed from each body's
+    first line if not. workers defaults to the number of CPUs. Only a few
+    items per worker are in flight at a time, so items may be a lazy
+    iterable of any length. Extra keyword arguments go to MultipartParser.
+    """
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = workers * 4
+
+    # Start the resource tracker before the workers, so that they share it.
+    # Otherwise each starts its own, and frees shared memory behind our back
+    # when it exits.
+    resource_tracker.ensure_running()
+
+    with ProcessPoolExecutor(workers) as executor:
+        in_flight = deque() if ordered else {}
+
+        def finish(future, index, item, shm):
+            try:
+                parts, error = future.result()
+            except Exception as e:
+                parts, error = None, e
+            finally:
+                if shm is not None:
+                    shm.close()
+                    shm.unlink()
+            return BatchResult(index, item, parts, error)
+
+        def drain(limit):
+            while len(in_flight) > limit:
+                if ordered:
+                    yield finish(*in_flight.popleft())
+                    continue
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield finish(future, *in_flight.pop(future))
+
+        try:
+            for index, item in enumerate(items):
+                future, shm = _submit(executor, item, boundary, block_size, kwargs)
+                if ordered:
+                    in_flight.append((future, index, item, shm))
+                else:
+                    in_flight[future] = (index, item, shm)
+                yield from drain(max_in_flight - 1)
+
+            yield from drain(0)
+        finally:
+            # Free the shared memory of anything left when the caller stops
+            # early.
+            entries = in_flight if ordered else ((f,) + e for f, e in in_flight.items())
+            for future, index, item, shm in list(entries):
+                future.cancel()
+                if shm is not None:
+                    wait([future])
+                    shm.close()
+                    shm.unlink()
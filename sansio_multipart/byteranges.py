@@ -0,0 +1,130 @@
+__all__ = ["ByteRangesParser", "RangePart", "RangeData", "parse_content_range"]
+
+
+import re
+from dataclasses import dataclass
+
+from typing import Tuple, Union
+
+from .parser import MultipartParser, Part, PartData
+from .errors import MalformedData
+
+
+_re_content_range = re.compile(r"^\s*bytes\s+(\d+)-(\d+)/(\d+|\*)\s*$", re.IGNORECASE)
+
+
+def parse_content_range(value) -> Tuple[int, int, Union[int, None]]:
+    """
+    Parse a Content-Range header value such as "bytes 0-499/1234" into a
+    (start, end, total) tuple. end is inclusive, and total is None when
+    the complete length is given as "*".
+    """
+    match = _re_content_range.match(value)
+    if match is None:
+        raise MalformedData("Invalid Content-Range header: %r" % value)
+
+    start, end, total = match.groups()
+    start, end = int(start), int(end)
+    total = None if total == "*" else int(total)
+    if end < start or (total is not None and end >= total):
+        raise MalformedData("Invalid Content-Range header: %r" % value)
+    return start, end, total
+
+
+class RangePart(Part):
+    """
+    The head of a multipart/byteranges part. start and end (inclusive) are
+    the byte range of the body in the complete resource, and total is its
+    length, or None if unknown.
+    """
+
+    __slots__ = ("start", "end", "total")
+
+    def __init__(self, start, end, total, **kwargs):
+        super().__init__(**kwargs)
+        self.start = start
+        self.end = end
+        self.total = total
+
+
+@dataclass(frozen=True)
+class RangeData(PartData):
+    """ PartData tagged with its offset in the complete resource """
+
+    __slots__ = ("offset",)
+
+    offset: int
+
+
+class ByteRangesParser(MultipartParser):
+    """
+    A parser for multipart/byteranges bodies, as sent in 206 Partial
+    Content responses to requests for several ranges.
+
+    Parts need no Content-Disposition, but must have a Content-Range. Each
+    part is given as a RangePart, and its body as RangeData events tagged
+    with the offset they belong at. A body longer or shorter than its range
+    raises MalformedData.
+    """
+
+    requires_disposition = False
+
+    def __init__(self, boundary, **kwargs):
+        super().__init__(boundary, **kwargs)
+        self.range_offset = None
+        self.range_end = None
+
+    def _emit_part(self, headers) -> None:
+        content_range = headers.get("Content-Range")
+        if content_range is None:
+            raise MalformedData("Content-Range header is missing.")
+
+        start, end, total = parse_content_range(content_range)
+        self.range_offset = start
+        self.range_end = end + 1
+
+        # The range fixes the length of the body, whatever Content-Length
+        # says.
+        self.expected_part_size = end + 1 - start
+
+        self.events_queue.append(
+            RangePart(
+                start,
+                end,
+                total,
+                charset=self.charset,
+                sink_factory=self.sink_factory,
+                headers=headers,
+            )
+        )
+
+    def _emit_data(self, pieces) -> None:
+        if self.zero_copy:
+            for piece in pieces:
+                view = memoryview(piece).toreadonly()
+                self.events_queue.append(
+                    RangeData(raw=view, size=len(view), offset=self.range_offset)
+                )
+                self.range_offset += len(view)
+            if self.stats is not None:
+                self.stats.part_data_events += len(pieces)
+            return
+
+        part_data_buffer = bytearray()
+        for piece in pieces:
+            part_data_buffer += piece
+
+        self.events_queue.append(
+            RangeData(
+                raw=part_data_buffer,
+                size=len(part_data_buffer),
+                offset=self.range_offset,
+            )
+        )
+        self.range_offset += len(part_data_buffer)
+        if self.stats is not None:
+            self.stats.part_data_events += 1
+
+    def _emit_part_end(self) -> None:
+        if self.range_offset != self.range_end and not self.skip_body:
+            raise MalformedData("Size of part body is less than its Content-Range.")
@@ -0,0 +1,85 @@
+__all__ = ["Base64Decoder", "QuotedPrintableDecoder", "get_decoder"]
+
+
+import binascii
+
+from .errors import MalformedData
+
+
+_WHITESPACE = b" \t\r\n"
+
+
+class Base64Decoder:
+    """
+    Decodes base64 data given in arbitrary pieces. Whitespace is ignored,
+    and an incomplete quantum at the end of a piece is kept until the next.
+    """
+
+    __slots__ = ("pending",)
+
+    def __init__(self):
+        self.pending = b""
+
+    def decode(self, pieces) -> bytes:
+        data = self.pending + b"".join(pieces).translate(None, _WHITESPACE)
+        usable = len(data) - len(data) % 4
+        self.pending = data[usable:]
+        try:
+            return binascii.a2b_base64(data[:usable])
+        except binascii.Error as e:
+            raise MalformedData("Invalid base64 data: %s" % e)
+
+    def flush(self) -> bytes:
+        if self.pending:
+            raise MalformedData("Base64 data ends with an incomplete quantum.")
+        return b""
+
+
+class QuotedPrintableDecoder:
+    """
+    Decodes quoted-printable data given in arbitrary pieces. An escape or
+    soft line break cut off at the end of a piece is kept until the next.
+    """
+
+    __slots__ = ("pending",)
+
+    def __init__(self):
+        self.pending = b""
+
+    def decode(self, pieces) -> bytes:
+        data = self.pending + b"".join(pieces)
+
+        # "=", "=X" and "=\r" may be the start of "=XX" or "=\r\n".
+        cut = data.rfind(b"=", max(0, len(data) - 2))
+        if cut == -1:
+            self.pending = b""
+        else:
+            data, self.pending = data[:cut], data[cut:]
+        return binascii.a2b_qp(data)
+
+    def flush(self) -> bytes:
+        data, self.pending = self.pending, b""
+        return binascii.a2b_qp(data)
+
+
+_DECODERS = {
+    "base64": Base64Decoder,
+    "quoted-printable": QuotedPrintableDecoder,
+}
+
+# Encodings that leave the data as it is.
+_IDENTITY = {"", "7bit", "8bit", "binary"}
+
+
+def get_decoder(encoding):
+    """
+    Return a new decoder for a Content-Transfer-Encoding, or None if the
+    encoding leaves the data as it is.
+    """
+    encoding = encoding.strip().lower()
+    if encoding in _IDENTITY:
+        return None
+    try:
+        return _DECODERS[encoding]()
+    except KeyError:
+        raise MalformedData("Unsupported Content-Transfer-Encoding: %s" % encoding)
@@ -0,0 +1,198 @@
+__all__ = ["MultipartEncoder", "FileSegment"]
+
+
+import io
+import os
+import stat
+from binascii import hexlify
+from collections import namedtuple
+from collections.abc import Mapping
+
+from typing import Generator, Union
+
+from .utils import header_quote, check_header_value, to_bytes
+
+
+FileSegment = namedtuple("FileSegment", "fd offset length")
+
+# A file without a regular file descriptor, read as the body is sent. offset
+# is where to seek to first, and length how much to send, each None if the
+# file can't tell.
+_StreamSegment = namedtuple("_StreamSegment", "file offset length")
+
+
+class MultipartEncoder:
+    """
+    Encodes fields and files as a multipart/form-data body, without ever
+    holding the whole body in memory.
+
+    fields is a mapping or an iterable of (name, value) pairs, where value
+    is a str or bytes. files is a mapping of name to a (filename, file) or
+    (filename, file, content_type) tuple, or an iterable of
+    (name, filename, file[, content_type]) tuples. A file is sent from its
+    current position to its end, and must not change size until the body
+    has been sent. Names, filenames and content types containing CR, LF or
+    NUL raise ValueError.
+
+    The body layout, and so content_length, is worked out up front. Iterate
+    over the encoder for the body as chunks of bytes, or over segments() to
+    get the parts of regular files opened in binary mode as
+    FileSegment(fd, offset, length) tuples, ready for os.sendfile.
+
+    Any other file object, such as a BytesIO, a gzip file or a pipe, is read
+    block_size bytes at a time as the body is sent. Its size is found by
+    seeking to its end, and if it can't be, as for a pipe, content_length is
+    None, and the body has to be sent without a Content-Length.
+    """
+
+    def __init__(
+        self, fields=(), files=(), boundary=None, charset="utf8", block_size=2 ** 16
+    ):
+        self.boundary = check_header_value(boundary or hexlify(os.urandom(16)).decode())
+        self.charset = charset
+        self.block_size = block_size
+
+        self.separator = b"--" + to_bytes(self.boundary) + b"\r\n"
+        self.terminator = b"--" + to_bytes(self.boundary) + b"--\r\n"
+
+        if isinstance(fields, Mapping):
+            fields = fields.items()
+        if isinstance(files, Mapping):
+            files = ((name,) + tuple(file) for name, file in files.items())
+
+        self._segments = []
+        for name, value in fields:
+            self._add_field(name, value)
+        for name, filename, file, *content_type in files:
+            self._add_file(name, filename, file, *content_type)
+        self._segments.append(self.terminator)
+
+        self.content_length = 0
+        for segment in self._segments:
+            if isinstance(segment, bytes):
+                self.content_length += len(segment)
+            elif segment.length is None:
+                self.content_length = None
+                break
+            else:
+                self.content_length += segment.length
+
+    @property
+    def content_type(self) -> str:
+        return "multipart/form-data; boundary=%s" % self.boundary
+
+    def segments(self) -> Generator[Union[bytes, FileSegment], None, None]:
+        """
+        Yield the body as bytes, except for regular files, which are given as
+        FileSegment tuples.
+        """
+        for segment in self._segments:
+            if isinstance(segment, _StreamSegment):
+                yield from self._read_stream(segment)
+            else:
+                yield segment
+
+    def __iter__(self) -> Generator[bytes, None, None]:
+        """
+        Yield the body in chunks of bytes. Files are read with os.pread, so
+        their positions are left alone.
+        """
+        for segment in self._segments:
+            if isinstance(segment, _StreamSegment):
+                yield from self._read_stream(segment)
+                continue
+            if not isinstance(segment, FileSegment):
+                yield segment
+                continue
+
+            fd, offset, remaining = segment
+            while remaining:
+                chunk = os.pread(fd, min(self.block_size, remaining), offset)
+                if not chunk:
+                    raise ValueError("File is shorter than when it was added.")
+                offset += len(chunk)
+                remaining -= len(chunk)
+                yield chunk
+
+    def _add_field(self, name, value) -> None:
+        self._segments.append(self._head("form-data; name=%s" % header_quote(name)))
+        self._segments.append(to_bytes(value, self.charset) + b"\r\n")
+
+    def _add_file(
+        self, name, filename, file, content_type="application/octet-stream"
+    ) -> None:
+        disposition = "form-data; name=%s; filename=%s" % (
+            header_quote(name),
+            header_quote(filename),
+        )
+        self._segments.append(self._head(disposition, content_type))
+        self._segments.append(_file_segment(file) or _stream_segment(file))
+        self._segments.append(b"\r\n")
+
+    def _read_stream(self, segment) -> Generator[bytes, None, None]:
+        file, offset, remaining = segment
+        if offset is not None:
+            file.seek(offset)
+
+        while remaining is None or remaining:
+            size = (
+                self.block_size
+                if remaining is None
+                else min(self.block_size, remaining)
+            )
+            chunk = file.read(size)
+            if not chunk:
+                if remaining:
+                    raise ValueError("File is shorter than when it was added.")
+                return
+            if remaining is not None:
+                remaining -= len(chunk)
+            yield chunk
+
+    def _head(self, disposition, content_type=None) -> bytes:
+        # Names, filenames and content types may come from clients. Don't
+        # let them add headers or parts of their own.
+        head = "Content-Disposition: %s\r\n" % check_header_value(disposition)
+        if content_type:
+            head += "Content-Type: %s\r\n" % check_header_value(content_type)
+        return self.separator + (head + "\r\n").encode(self.charset)
+
+
+def _file_segment(file) -> Union[FileSegment, None]:
+    """
+    A FileSegment for the rest of file, if it reads a regular file straight
+    from its file descriptor. Other objects with a fileno, such as gzip
+    files, don't read what the descriptor holds.
+    """
+    if not isinstance(file, (io.FileIO, io.BufferedReader, io.BufferedRandom)):
+        return None
+    if not isinstance(getattr(file, "raw", file), io.FileIO):
+        return None
+
+    fd = file.fileno()
+    size = os.fstat(fd)
+    if not stat.S_ISREG(size.st_mode):
+        return None
+    offset = file.tell()
+    return FileSegment(fd, offset, size.st_size - offset)
+
+
+def _stream_segment(file) -> _StreamSegment:
+    """
+    A _StreamSegment for the rest of file, with its size if seeking to its
+    end tells it.
+    """
+    try:
+        offset = file.tell() if file.seekable() else None
+    except (AttributeError, OSError):
+        offset = None
+    if offset is None:
+        return _StreamSegment(file, None, None)
+
+    try:
+        end = file.seek(0, io.SEEK_END)
+    except (OSError, ValueError):
+        # Not every seekable stream can seek from its end.
+        return _StreamSegment(file, offset, None)
+    file.seek(offset)
+    return _StreamSegment(file, offset, end - offset)
@@ -8,3 +8,31 @@ class UnexpectedExit(MultipartError, EOFError):
 
 class MalformedData(MultipartError):
     ...
+
+
+class LimitExceeded(MultipartError):
+    ...
+
+
+class TooManyParts(LimitExceeded):
+    ...
+
+
+class HeaderTooLarge(LimitExceeded):
+    ...
+
+
+class TooManyHeaders(LimitExceeded):
+    ...
+
+
+class PartTooLarge(LimitExceeded):
+    ...
+
+
+class BodyTooLarge(LimitExceeded):
+    ...
+
+
+class FieldTooLarge(LimitExceeded):
+    ...
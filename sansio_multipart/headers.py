@@ -0,0 +1,64 @@
+__all__ = ["PartHeaders"]
+
+
+from typing import List, Tuple
+
+
+class PartHeaders:
+    """
+    The headers of a part, as parsed. On the first lookup, names are
+    lowercased once and the first value for each name is kept in a dict, so
+    lookups don't search the list. Parts whose headers are never looked at
+    don't pay for the dict.
+
+    Lookups are case insensitive, and behave like those of
+    wsgiref.headers.Headers.
+    """
+
+    __slots__ = ("headerlist", "_first_values")
+
+    def __init__(self, headerlist=None):
+        self.headerlist = list(headerlist or ())
+        self._first_values = None
+
+    @property
+    def first_values(self) -> dict:
+        if self._first_values is None:
+            first_values = {}
+            for name, value in self.headerlist:
+                first_values.setdefault(name.lower(), value)
+            self._first_values = first_values
+        return self._first_values
+
+    def add(self, name, value) -> None:
+        self.headerlist.append((name, value))
+        if self._first_values is not None:
+            self._first_values.setdefault(name.lower(), value)
+
+    def get(self, name, default=None):
+        return self.first_values.get(name.lower(), default)
+
+    def get_all(self, name) -> List[str]:
+        name = name.lower()
+        return [v for n, v in self.headerlist if n.lower() == name]
+
+    def __getitem__(self, name):
+        return self.first_values.get(name.lower())
+
+    def __contains__(self, name) -> bool:
+        return name.lower() in self.first_values
+
+    def __len__(self) -> int:
+        return len(self.headerlist)
+
+    def keys(self) -> List[str]:
+        return [n for n, v in self.headerlist]
+
+    def values(self) -> List[str]:
+        return [v for n, v in self.headerlist]
+
+    def items(self) -> List[Tuple[str, str]]:
+        return list(self.headerlist)
+
+    def __repr__(self):
+        return "%s(%r)" % (type(self).__name__, self.headerlist)
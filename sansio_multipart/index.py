@@ -0,0 +1,143 @@
+__all__ = ["index_parts", "PartIndex"]
+
+
+from collections import namedtuple
+
+from typing import List
+
+from .parser import MultipartParser, Part, States, _scannable
+from .errors import UnexpectedExit
+
+
+_CR = ord("\r")
+_LF = ord("\n")
+
+
+class PartIndex(
+    namedtuple("PartIndex", "header_start body_start body_end name filename")
+):
+    """
+    Where a part lies in a complete multipart body. header_start is the
+    offset of the part's separator line, and body_start:body_end its body.
+    """
+
+    __slots__ = ()
+
+    def body(self, buffer) -> memoryview:
+        """ The part's body, as a view of buffer (an mmap, say) """
+        return memoryview(buffer)[self.body_start : self.body_end]
+
+
+class _IndexingParser(MultipartParser):
+    """
+    Records the offsets of each part in the body fed to it, rather than
+    emitting its data.
+    """
+
+    def __init__(self, boundary, **kwargs):
+        super().__init__(boundary, **kwargs)
+        self.index = []
+        self.offset = 0
+        self.header_start = None
+        self.body_start = None
+        self.body_size = 0
+        self.part = None
+
+    def feed(self, chunk) -> None:
+        self._queue_events(chunk)
+        self.offset += len(chunk)
+
+    def scan(self, body, start, end) -> None:
+        """
+        Parse body[start:end] in place, where body is the whole of the body,
+        so that positions in it are already offsets.
+        """
+        self._queue_events(body, start, end)
+
+    def _parse_part(self, data, pos, end) -> int:
+        if self.header_start is None:
+            if self.buffer:
+                # The separator line started in the held back bytes.
+                self.header_start = self.offset + pos - len(self.buffer)
+            else:
+                start = pos
+                while start < end and data[start] in (_CR, _LF):
+                    start += 1
+                if start < end:
+                    self.header_start = self.offset + start
+
+        pos = super()._parse_part(data, pos, end)
+        if self.state is States.BUILDING_BODY:
+            self.body_start = self.offset + pos
+        return pos
+
+    def _build_part_data(self, data, pos, end) -> int:
+        if self.skip_lf and pos < end and data[pos] == _LF:
+            # The LF of the blank line after the headers.
+            self.body_start += 1
+        return super()._build_part_data(data, pos, end)
+
+    def _emit_part(self, headers) -> None:
+        self.part = Part(charset=self.charset, headers=headers)
+        self.body_size = 0
+
+    def _emit_data(self, pieces) -> None:
+        for piece in pieces:
+            self.body_size += len(piece)
+
+    def _emit_part_end(self) -> None:
+        self.index.append(
+            PartIndex(
+                self.header_start,
+                self.body_start,
+                self.body_start + self.body_size,
+                self.part.name,
+                self.part.filename,
+            )
+        )
+        self.header_start = None
+        self.part = None
+
+    def _emit_need_data(self) -> None:
+        pass
+
+    def _emit_finished(self) -> None:
+        pass
+
+
+def index_parts(source, boundary, block_size=2 ** 20, **kwargs) -> List[PartIndex]:
+    """
+    Scan a complete multipart body once, and return a PartIndex for each of
+    its parts.
+
+    source is an mmap or other bytes-like object, or a file object opened
+    for binary reading. Extra keyword arguments go to MultipartParser. Once
+    indexed, a part's body can be read back without parsing anything before
+    it, as a zero copy slice with PartIndex.body(mmap).
+    """
+    parser = _IndexingParser(boundary, **kwargs)
+    body = _scannable(source)
+
+    if body is not None:
+        # Scanned in place, rather than copied out a block at a time. This
+        # comes first, as an mmap has a read method too.
+        for start in range(0, len(body), block_size):
+            if parser.state is States.FINISHED:
+                break
+            parser.scan(body, start, min(start + block_size, len(body)))
+    elif hasattr(source, "read"):
+        while parser.state is not States.FINISHED:
+            chunk = source.read(block_size)
+            if not chunk:
+                break
+            parser.feed(chunk)
+    else:
+        with memoryview(source) as view:
+            for start in range(0, len(view), block_size):
+                if parser.state is States.FINISHED:
+                    break
+                parser.feed(view[start : start + block_size])
+
+    if parser.state is not States.FINISHED:
+        raise UnexpectedExit("Unexpected end. No terminator line parsed.")
+    return parser.index
@@ -1,17 +1,75 @@
-__all__ = ["MultipartParser", "Part", "PartData", "Events"]
-
-
+__all__ = [
+    "MultipartParser",
+    "MultipartCallbackParser",
+    "Part",
+    "PartData",
+    "Events",
+    "ReadHint",
+    "parse_part_headers",
+]
+
+
+import mmap
 from dataclasses import dataclass
-from itertools import chain
 from enum import Enum, auto
-from collections import deque
-
-from wsgiref.headers import Headers
+from collections import deque, namedtuple
 
+from functools import partial, lru_cache
+from time import perf_counter
 from typing import Union, Generator, List, Tuple
 
 from .utils import to_bytes, parse_options_header
-from .errors import UnexpectedExit, MalformedData
+from .headers import PartHeaders
+from .decoders import get_decoder
+from .errors import (
+    UnexpectedExit,
+    MalformedData,
+    TooManyParts,
+    HeaderTooLarge,
+    TooManyHeaders,
+    PartTooLarge,
+    BodyTooLarge,
+)
+from .sinks import SpooledSink
+from .stats import ParserStats
+
+
+_CR = ord("\r")
+_LF = ord("\n")
+_DASH = ord("-")
+_NEWLINE_BYTES = (_CR, _LF)
+
+# Types the parser can search in place.
+_SCANNABLE_TYPES = (bytes, bytearray, mmap.mmap)
+
+
+@lru_cache(maxsize=256)
+def _boundary_matcher(boundary: bytes) -> Tuple[bytes, bytes, int]:
+    """
+    The separator and terminator lines for a boundary, and the length of
+    the separator. Cached, as clients tend to reuse their boundaries, so
+    boundary must be given as bytes.
+    """
+    separator = b"--" + boundary
+    return separator, separator + b"--", len(separator)
+
+
+def _scannable(chunk):
+    """
+    Return chunk if the parser can search it in place, or the object under
+    a memoryview covering all of one that it can. None if chunk has to be
+    copied first.
+    """
+    if isinstance(chunk, _SCANNABLE_TYPES):
+        return chunk
+    if (
+        isinstance(chunk, memoryview)
+        and isinstance(chunk.obj, _SCANNABLE_TYPES)
+        and chunk.c_contiguous
+        and chunk.nbytes == len(chunk.obj)
+    ):
+        return chunk.obj
+    return None
 
 
 class Events(Enum):
@@ -28,60 +86,272 @@ class States(Enum):
     ERROR = auto()
 
 
-@dataclass
+# The state the parser settles back in to, once a NEED_DATA state has been
+# reported.
+_SETTLED_STATES = {state: state for state in States}
+_SETTLED_STATES[States.BUILDING_HEADERS_NEED_DATA] = States.BUILDING_HEADERS
+_SETTLED_STATES[States.BUILDING_BODY_NEED_DATA] = States.BUILDING_BODY
+
+
+ReadHint = namedtuple("ReadHint", "minimum suggested")
+ReadHint.__doc__ = """
+How many bytes the parser can usefully take next. minimum is the least
+that settles any delimiter it is holding back, and suggested as much as it
+can use without reading past the end of the body.
+"""
+
+
+@dataclass(frozen=True)
 class PartData:
-    raw: bytearray
+    __slots__ = ("raw", "size")
+
+    raw: Union[bytearray, memoryview]
     size: int
 
 
 class Part:
-    def __init__(self, charset="latin1"):
-        self.headerlist = []
-        self.headers = None
-        self.data = bytearray()
+    __slots__ = (
+        "headers",
+        "sink_factory",
+        "sink",
+        "size",
+        "digests",
+        "default_charset",
+        "_disposition",
+        "_content_type",
+        "_value",
+    )
+
+    def __init__(self, charset="latin1", sink_factory=SpooledSink, headers=None):
+        self.headers = headers if headers is not None else PartHeaders()
+        self.sink_factory = sink_factory
+        self.sink = None
         self.size = 0
-        self.disposition = None
-        self.name = None
-        self.filename = None
-        self.content_type = None
-        self.charset = charset
+        self.digests = None
+        self.default_charset = charset
+        self._disposition = None
+        self._content_type = None
+        self._value = None
+
+    @property
+    def headerlist(self) -> List[Tuple[str, str]]:
+        return self.headers.headerlist
+
+    @property
+    def disposition(self) -> str:
+        return self._parse_disposition()[0]
+
+    @property
+    def options(self) -> dict:
+        """ Options of the Content-Disposition header """
+        return self._parse_disposition()[1]
+
+    @property
+    def name(self) -> Union[str, None]:
+        return self._parse_disposition()[1].get("name")
+
+    @property
+    def filename(self) -> Union[str, None]:
+        return self._parse_disposition()[1].get("filename")
+
+    @property
+    def content_type(self) -> str:
+        return self._parse_content_type()[0]
+
+    @property
+    def charset(self) -> str:
+        return self._parse_content_type()[1].get("charset") or self.default_charset
+
+    def _parse_disposition(self) -> Tuple[str, dict]:
+        if self._disposition is None:
+            self._disposition = parse_options_header(
+                self.headers.get("Content-Disposition", "")
+            )
+        return self._disposition
+
+    def _parse_content_type(self) -> Tuple[str, dict]:
+        if self._content_type is None:
+            self._content_type = parse_options_header(
+                self.headers.get("Content-Type", "")
+            )
+        return self._content_type
 
     @property
     def value(self) -> str:
         """ Data decoded with the specified charset """
-        return self.data.decode(self.charset)
+        if self._value is None:
+            self._value = self.raw.decode(self.charset)
+        return self._value
 
     @property
-    def raw(self) -> bytearray:
+    def raw(self) -> bytes:
         """ Data without decoding """
-        return self.data
+        if self.sink is None:
+            return b""
+        return self.sink.getvalue()
+
+    @property
+    def file(self):
+        """ File like object holding the buffered data, rewound to the start """
+        if self.sink is None:
+            self.sink = self.sink_factory()
+        self.sink.file.seek(0)
+        return self.sink.file
+
+    def is_buffered(self) -> bool:
+        """ Return true if the data is fully buffered in memory. """
+        return self.sink is None or self.sink.is_buffered()
+
+    def save_as(self, path) -> int:
+        """ Save the buffered data to a file at path, returning its size. """
+        if self.sink is None:
+            self.sink = self.sink_factory()
+        return self.sink.save_as(path)
 
     def buffer(self, part_data) -> None:
-        self.data += part_data.raw
+        if self.sink is None:
+            self.sink = self.sink_factory()
+        self.sink.write(part_data.raw)
         self.size += part_data.size
+        self._value = None
+
+    def close(self) -> None:
+        if self.sink is not None:
+            self.sink.close()
 
 
 class MultipartParser:
-    def __init__(self, boundary, content_length=None, charset="latin1"):
-        self.boundary = boundary
-        self.separator = b"--" + to_bytes(self.boundary)
-        self.terminator = b"--" + to_bytes(self.boundary) + b"--"
+    # Every multipart/form-data part must have a Content-Disposition header.
+    requires_disposition = True
+
+    def __init__(
+        self,
+        boundary,
+        content_length=None,
+        charset="latin1",
+        zero_copy=False,
+        mem_limit=2 ** 18,
+        disk_limit=2 ** 30,
+        sink_factory=None,
+        stats=False,
+        on_transition=None,
+        max_parts=None,
+        max_header_bytes=2 ** 16,
+        max_headers_per_part=64,
+        max_part_size=None,
+        max_total_size=None,
+        decode_transfer_encoding=False,
+        trust_part_length=False,
+    ):
+        """
+        With zero_copy, PartData.raw is a read only memoryview of the chunk
+        given to recv, rather than a copy of it. The view is only valid until
+        the next call to recv, and only while the caller leaves the chunk
+        unchanged. Consume or copy it before feeding the parser again.
+
+        Chunks are parsed in place if they are bytes, bytearray or mmap
+        objects, or memoryviews of the whole of one. Other chunks, such as a
+        memoryview of part of a larger buffer, are copied first. Use
+        get_buffer and commit to read into a buffer without a copy.
+
+        Part.buffer stores data in a sink made by sink_factory. By default
+        that is a SpooledSink, which keeps up to mem_limit bytes of a part in
+        memory before moving it to disk, and refuses to store more than
+        disk_limit bytes.
+
+        With stats, the parser counts the work it does in a ParserStats
+        object, as self.stats. on_transition is called with the old and new
+        state whenever the parser moves between States.BUILDING_HEADERS,
+        States.BUILDING_BODY, States.FINISHED and States.ERROR. Neither costs
+        more than a check per parsing step when not used.
+
+        Limits are enforced as data arrives, raising a LimitExceeded
+        subclass as soon as one is passed. None means no limit.
+
+        * max_parts: number of parts (TooManyParts).
+        * max_header_bytes: bytes in the separator line and header segment
+          of a part (HeaderTooLarge).
+        * max_headers_per_part: header lines in a part (TooManyHeaders).
+        * max_part_size: body bytes in a part (PartTooLarge).
+        * max_total_size: bytes given to recv in total (BodyTooLarge).
+
+        With decode_transfer_encoding, the bodies of parts with a base64 or
+        quoted-printable Content-Transfer-Encoding are decoded as they
+        arrive, and PartData holds the decoded bytes. Limits and part
+        Content-Length headers still apply to the encoded bytes.
+
+        With trust_part_length, the body of a part with a Content-Length is
+        taken to be that long, and is not searched for a delimiter until
+        near its end. This is much faster for large parts, but a part that
+        overstates its length swallows the parts after it, so only use it
+        for bodies from a trusted source.
+        """
+        self.charset = charset
+        self.zero_copy = zero_copy
+        self.sink_factory = sink_factory or partial(
+            SpooledSink, mem_limit=mem_limit, disk_limit=disk_limit
+        )
 
-        self.separator_len = len(self.separator)
+        self.stats = ParserStats() if stats else None
+        self.on_transition = on_transition
 
-        self.charset = charset
+        self.max_parts = max_parts
+        self.max_header_bytes = max_header_bytes
+        self.max_headers_per_part = max_headers_per_part
+        self.max_part_size = max_part_size
+        self.max_total_size = max_total_size
 
-        self.state = States.BUILDING_HEADERS
-        self.events_queue = deque()
+        self.decode_transfer_encoding = decode_transfer_encoding
+        self.trust_part_length = trust_part_length
 
+        self.events_queue = deque()
         self.buffer = bytearray()
-        self.last_partial_line = None
+        self.recv_buffer = bytearray()
+
+        self._start(boundary, content_length)
+
+    def _start(self, boundary, content_length) -> None:
+        """
+        Set up the state for parsing a new body.
+        """
+        self.boundary = boundary
+        self.separator, self.terminator, self.separator_len = _boundary_matcher(
+            bytes(to_bytes(boundary))
+        )
+        self.content_length = content_length
+
+        self.state = States.BUILDING_HEADERS
 
-        self.current_part = None
+        self.skip_lf = False
+        self.body_line_start = False
+
+        self.headers = None
+        self.part_disposition = None
+        self.part_content_length = None
+        self.part_transfer_encoding = None
+        self.part_decoder = None
+        self.skip_body = False
 
         self.expected_part_size = None
         self.current_part_size = 0
 
+        self.part_count = 0
+        self.part_header_bytes = 0
+        self.total_size = 0
+
+    def reset(self, boundary, content_length=None) -> None:
+        """
+        Make the parser ready to parse another body, keeping its settings,
+        limits and buffers. Lets servers pool parsers rather than build one
+        per request. Any events still queued are dropped.
+        """
+        self.events_queue.clear()
+        self.buffer.clear()
+        if self.stats is not None:
+            self.stats = ParserStats()
+
+        self._start(boundary, content_length)
+
     def parts(self) -> List[Union[Part, PartData, Events]]:
         return list(self)
 
@@ -96,6 +366,95 @@ class MultipartParser:
         self._queue_events(chunk)
         return self.parts()
 
+    def skip_part(self) -> None:
+        """
+        Skip the body of the part whose Part event was the last one taken
+        from the queue. Its PartData events still queued are dropped, and
+        the parser scans past the rest of its body without emitting it.
+
+        Events must be taken one at a time, with next_event or by iterating
+        over the parser, for the queue to show where the part ends. parse
+        empties the queue up front.
+        """
+        queue = self.events_queue
+        while queue and type(queue[0]) is PartData:
+            queue.popleft()
+
+        for event in queue:
+            if isinstance(event, Part) or event is Events.FINISHED:
+                # The parser is already past the end of the part.
+                return
+
+        if _SETTLED_STATES[self.state] is States.BUILDING_BODY:
+            self.skip_body = True
+
+    def read_hint(self, block_size=2 ** 16, max_size=2 ** 22) -> ReadHint:
+        """
+        Return a ReadHint for the next read. block_size bytes are suggested,
+        unless the parser is inside a part with a Content-Length, when the
+        rest of the part and the delimiter line after it are, up to
+        max_size. With the content_length of the body, no more than is left
+        of it is suggested. Once parsing is complete, both are 0.
+
+        The minimum is 1, unless the parser is holding back the end of the
+        last chunk as the possible start of a delimiter line, when it is
+        what it takes to tell. Without the content_length, that may be more
+        than a body ending in a terminator line with no newline has left.
+        """
+        if self.state is States.FINISHED:
+            return ReadHint(0, 0)
+
+        minimum = 1
+        suggested = block_size
+        if _SETTLED_STATES[self.state] is States.BUILDING_BODY:
+            if self.buffer:
+                # A newline, the separator, and the CRLF or -- after it. A
+                # part's body may start with the separator, without a newline.
+                first = self.buffer[0]
+                newline = 0 if first == _DASH else 1 if first == _LF else 2
+                minimum = max(1, newline + self.separator_len + 2 - len(self.buffer))
+
+            if self.expected_part_size is not None:
+                part_left = self.expected_part_size - self.current_part_size
+                # CRLF, the separator, and the CRLF or -- after it.
+                delimiter_left = self.separator_len + 4 - len(self.buffer)
+                suggested = min(max(suggested, part_left + delimiter_left), max_size)
+
+        suggested = max(suggested, minimum)
+        if self.content_length is not None and self.content_length >= 0:
+            suggested = min(suggested, self.content_length - self.total_size)
+
+        suggested = max(0, suggested)
+        return ReadHint(min(minimum, suggested), suggested)
+
+    def get_buffer(self, sizehint=2 ** 16) -> memoryview:
+        """
+        Return a writable buffer of at least sizehint bytes, for the next
+        chunk to be read straight into, with socket.recv_into or
+        file.readinto. Then pass the number of bytes read to commit.
+
+        The same buffer is handed out each time, unless a larger one is
+        needed. In zero_copy mode, PartData from the last commit stays valid
+        only until the buffer is read into again.
+        """
+        if len(self.recv_buffer) < sizehint:
+            # Replaced rather than resized, as zero copy PartData may still
+            # hold views of the old one.
+            self.recv_buffer = bytearray(sizehint)
+        return memoryview(self.recv_buffer)
+
+    def commit(self, nbytes) -> None:
+        """
+        Queue any events parsing the first nbytes of the buffer from
+        get_buffer may create.
+        """
+        if not 0 <= nbytes <= len(self.recv_buffer):
+            raise ValueError(
+                "Cannot commit %d bytes of a %d byte buffer."
+                % (nbytes, len(self.recv_buffer))
+            )
+        self._queue_events(self.recv_buffer, end=nbytes)
+
     def next_event(self) -> Union[Part, PartData, Events]:
         """
         Return the next event from the queue.
@@ -128,233 +487,614 @@ class MultipartParser:
             else:
                 yield event
 
-    def _queue_events(self, chunk) -> None:
+    def _queue_events(self, chunk, start=0, end=None) -> None:
         """
         Send the given chunk through the parser based on the current  parser
-        state, and add any events that result to the events queue.
+        state, and add any events that result to the events queue. Only
+        chunk[start:end] is parsed.
         """
-        # Prepend the current buffer if there is any and clear the buffer.
-        # Carries partial chunks from one chunk parsing to the next.
         if self.state is States.ERROR:
             raise RuntimeError("Cannot use parser in ERROR state.")
 
-        if self.buffer:
-            chunk = self.buffer + chunk
-            self.buffer = bytearray()
-        chunk = iter(chunk.splitlines(True))
+        scannable = _scannable(chunk)
+        chunk = bytes(chunk) if scannable is None else scannable
+
+        # The unparsed region of the input is data[pos:end]. Body scanning
+        # works on it in place, rather than copying it around line by line.
+        data, pos, end = chunk, start, len(chunk) if end is None else end
+
+        self.total_size += end - start
+        if self.max_total_size is not None and self.total_size > self.max_total_size:
+            if self.on_transition is not None:
+                self.on_transition(_SETTLED_STATES[self.state], States.ERROR)
+            self.state = States.ERROR
+            raise BodyTooLarge("Request body exceeds %d bytes." % self.max_total_size)
+
+        instrumented = self.stats is not None or self.on_transition is not None
+        if self.stats is not None:
+            self.stats.recv_calls += 1
+            self.stats.bytes_received += end - start
 
         while True:
             try:
-                # Prepend the buffer between state changes, to carry
-                # separators and terminations between parsing routes.
-                if self.buffer:
-                    split_buffer = iter(self.buffer.splitlines(True))
-                    chunk = chain(split_buffer, chunk)
-                    self.buffer = bytearray()
+                if instrumented:
+                    step = (
+                        self.state,
+                        pos,
+                        self.buffer,
+                        len(self.buffer),
+                        perf_counter(),
+                    )
 
                 # Depending on the parser's current state, attempt to
-                # either build and queue a Part / PartData object, or
-                # queue actionable events.
+                # either build and emit a Part / PartData object, or
+                # emit actionable events.
                 if self.state is States.BUILDING_HEADERS:
-                    maybe_part = self._parse_part(chunk)
-                    if maybe_part:
-                        self.events_queue.append(maybe_part)
+                    pos = self._parse_part(data, pos, end)
 
                 elif self.state is States.BUILDING_BODY:
-                    maybe_part_data = self._build_part_data(chunk)
-                    if maybe_part_data:
-                        self.events_queue.append(maybe_part_data)
+                    pos = self._build_part_data(data, pos, end)
 
-                # queue events based on parser state post parse attempt
+                if instrumented:
+                    self._instrument(step, pos)
+
+                # emit events based on parser state post parse attempt
                 if self.state is States.BUILDING_HEADERS_NEED_DATA:
-                    self.events_queue.append(Events.NEED_DATA)
                     self.state = States.BUILDING_HEADERS
+                    self._emit_need_data()
                     break
 
                 elif self.state is States.BUILDING_BODY_NEED_DATA:
-                    self.events_queue.append(Events.NEED_DATA)
                     self.state = States.BUILDING_BODY
+                    self._emit_need_data()
                     break
 
                 elif self.state is States.FINISHED:
-                    self.events_queue.append(Events.FINISHED)
+                    self._emit_finished()
                     break
             except Exception:
+                if self.on_transition is not None:
+                    self.on_transition(_SETTLED_STATES[self.state], States.ERROR)
                 self.state = States.ERROR
                 raise
 
-    def _parse_part(self, chunk_lines) -> Union[Part, None]:
+    def _instrument(self, step, pos) -> None:
         """
-        Try to construct and return a Part object, given sufficient
-        data in the chunk. If too little data is given, the given data
-        will be buffered, and a fresh attempt to create the Part will
-        be made upon future request.
+        Update the stats, and report any state transition, for a parsing
+        step. step holds what the parser looked like before it.
         """
-        lines = self._separate_newlines(chunk_lines)
-
-        # Consume first boundary. Ignore leading blank lines
-        maybe_seperator, first_newline = next(
-            ((l, nl) for l, nl in lines if l), (b"", b"")
-        )
-
-
-        if not first_newline:
-            # We have not recieved a full line of headers.
-            self._buffer_chunk([(maybe_seperator, first_newline)])
-            self.state = States.BUILDING_HEADERS_NEED_DATA
-            return
-
-        if maybe_seperator != self.separator:
-            if len(maybe_seperator) >= self.separator_len:
-                raise MalformedData("Part does not start with boundary")
-
-        # Buffer the beginning of the part in case we need to reattempt
-        # creation later (incomplete data).
-        self._buffer_chunk([(maybe_seperator, first_newline)])
-
-        self.current_part = self.current_part or Part(charset=self.charset)
-        # alias the part so we can return it later and not wipe it
-        # with state change
-        part = self.current_part
-
-        for line, newline in lines:
-            self._construct_part(part, line, newline)
+        state, start, buffer, buffer_len, started = step
+        new_state = _SETTLED_STATES[self.state]
+
+        stats = self.stats
+        if stats is not None:
+            elapsed = perf_counter() - started
+            if self.buffer is not buffer:
+                stats.bytes_buffered += len(self.buffer)
+            elif len(self.buffer) > buffer_len:
+                stats.bytes_buffered += len(self.buffer) - buffer_len
+
+            # Bytes held back in the buffer are only counted once the step
+            # that takes them out of it settles what they are, so that the
+            # counts don't depend on how the body is chunked.
+            scanned = pos - start + buffer_len - len(self.buffer)
+            if state is States.BUILDING_HEADERS:
+                stats.header_seconds += elapsed
+                stats.header_bytes += scanned
+            elif state is States.BUILDING_BODY:
+                stats.body_seconds += elapsed
+            stats.bytes_scanned += scanned
+
+        if new_state is not state and self.on_transition is not None:
+            self.on_transition(state, new_state)
+
+    def _parse_part(self, data, pos, end) -> int:
+        """
+        Try to parse the headers of the next part from data[pos:end], and
+        emit the part once they are complete. Returns the position parsing
+        should resume from.
 
-            if self.state is States.BUILDING_HEADERS_NEED_DATA:
-                self._buffer_chunk([(line, newline)])
-                self._buffer_chunk(lines)
+        Complete header lines are handled as soon as they arrive, and only a
+        trailing partial line is buffered. Each byte is scanned once, no
+        matter how finely the headers are split up across chunks.
+        """
+        start = pos
+        max_header_bytes = self.max_header_bytes
+
+        while pos < end:
+            if self.skip_lf:
+                # The last chunk ended on a CR. Don't mistake the LF of a
+                # split CRLF for a blank line.
+                self.skip_lf = False
+                if data[pos] == _LF:
+                    pos += 1
+                    continue
+
+            newline = data.find(b"\n", pos, end)
+            cr = data.find(b"\r", pos, end if newline == -1 else newline)
+            if cr != -1:
+                newline = cr
+
+            if newline == -1:
+                # We have not recieved a full line of headers.
+                if max_header_bytes is not None:
+                    self._check_header_bytes(end - start)
+                self.buffer += memoryview(data)[pos:end]
                 break
 
-            elif self.state is States.BUILDING_BODY:
+            if self.buffer:
+                self.buffer += memoryview(data)[pos:newline]
+                line = self.buffer
                 self.buffer = bytearray()
-                self._buffer_chunk(lines)
-                return part
-        else:
-            # We have iterated the given data to completion, but have not
-            # recieved enough data to build the Part.
-            self.state = States.BUILDING_HEADERS_NEED_DATA
-
-    def _construct_part(self, part, line, newline) -> None:
+            else:
+                line = data[pos:newline]
+
+            pos = newline + 1
+            if newline == cr:
+                if pos == end:
+                    self.skip_lf = True
+                elif data[pos] == _LF:
+                    pos += 1
+
+            if max_header_bytes is not None:
+                self._check_header_bytes(pos - start)
+
+            if self.headers is None:
+                # Consume first boundary. Ignore leading blank lines
+                if not line:
+                    continue
+                if line != self.separator:
+                    raise MalformedData("Part does not start with boundary")
+                self.part_count += 1
+                if self.max_parts is not None and self.part_count > self.max_parts:
+                    raise TooManyParts("More than %d parts." % self.max_parts)
+                self.headers = PartHeaders()
+                self.part_disposition = None
+                self.part_content_length = None
+                self.part_transfer_encoding = None
+                continue
+
+            self._construct_part(line)
+
+            if self.state is States.BUILDING_BODY:
+                self.body_line_start = True
+                if self.skip_lf:
+                    # The LF of the blank line is still to come, and counts
+                    # as a header byte. See _build_part_data.
+                    self.part_header_bytes += pos - start
+                else:
+                    self.part_header_bytes = 0
+                return pos
+
+        # We have used up the given data, but have not recieved enough
+        # data to build the Part.
+        self.part_header_bytes += end - start
+        self.state = States.BUILDING_HEADERS_NEED_DATA
+        return end
+
+    def _check_header_bytes(self, size) -> None:
+        if self.part_header_bytes + size > self.max_header_bytes:
+            raise HeaderTooLarge(
+                "Part headers exceed %d bytes." % self.max_header_bytes
+            )
+
+    def _construct_part(self, line) -> None:
         """
-        Add headers to the Part as they are parsed.
+        Add headers to the part's headers as they are parsed, and emit the
+        part once the header segment ends.
         """
         line = line.decode(self.charset)
 
-        if not newline:
-            self.state = States.BUILDING_HEADERS_NEED_DATA
-            return
-
         if not line.strip():
             # blank line -> end of header segment
-            part.headers = Headers(part.headerlist)
-            content_disposition = part.headers.get("Content-Disposition", "")
-            content_type = part.headers.get("Content-Type", "")
+            headers = self.headers
+            self.headers = None
 
-            if not content_disposition:
+            if self.requires_disposition and not self.part_disposition:
                 raise MalformedData("Content-Disposition header is missing.")
 
-            part.disposition, part.options = parse_options_header(content_disposition)
-            part.name = part.options.get("name")
-            part.filename = part.options.get("filename")
-            part.content_type, options = parse_options_header(content_type)
-            part.charset = options.get("charset") or part.charset
+            if self.part_content_length is not None:
+                length = self.part_content_length
+                if not (length.isascii() and length.isdigit()):
+                    raise MalformedData("Invalid part Content-Length: %r" % length)
+                self.expected_part_size = int(length)
 
-            content_length = part.headers.get("Content-Length")
-            if content_length is not None:
-                self.expected_part_size = int(content_length)
+            if self.decode_transfer_encoding and self.part_transfer_encoding:
+                self.part_decoder = get_decoder(self.part_transfer_encoding)
 
-            self.current_part = None
             self.state = States.BUILDING_BODY
+            if self.stats is not None:
+                self.stats.parts += 1
+            self._emit_part(headers)
             return
 
-        if ":" not in line:
+        name, colon, value = line.partition(":")
+        if not colon:
             raise MalformedData("Syntax error in header: No colon.")
 
-        name, value = line.split(":", 1)
-        part.headerlist.append((name.strip(), value.strip()))
-
-    def _build_part_data(self, chunk_lines) -> Union[PartData, None]:
+        if (
+            self.max_headers_per_part is not None
+            and len(self.headers) >= self.max_headers_per_part
+        ):
+            raise TooManyHeaders(
+                "Part has more than %d headers." % self.max_headers_per_part
+            )
+
+        name = name.strip()
+        value = value.strip()
+        self.headers.add(name, value)
+
+        # Note the first of the headers the parser itself needs.
+        name = name.lower()
+        if name == "content-disposition":
+            if self.part_disposition is None:
+                self.part_disposition = value
+        elif name == "content-length":
+            if self.part_content_length is None:
+                self.part_content_length = value
+        elif name == "content-transfer-encoding":
+            if self.part_transfer_encoding is None:
+                self.part_transfer_encoding = value
+
+    def _build_part_data(self, data, pos, end) -> int:
         """
-        Parse through the chunk, creating and returning PartData objects when possible.
+        Scan data[pos:end] for the end of the current part body, emitting
+        the body bytes found. Returns the position parsing should resume
+        from.
         """
-        part_data_buffer = bytearray()
+        pieces = []
+
+        if self.skip_lf and pos < end:
+            # The headers ended on a CR at the end of the last chunk.
+            self.skip_lf = False
+            if data[pos] == _LF:
+                pos += 1
+                if self.max_header_bytes is not None:
+                    self._check_header_bytes(1)
+                if self.stats is not None:
+                    self.stats.header_bytes += 1
+            self.part_header_bytes = 0
+
+        if (
+            self.trust_part_length
+            and self.expected_part_size is not None
+            and not self.buffer
+        ):
+            # The part's Content-Length is trusted to say this much is body
+            # data, so there is no need to look for the delimiter in it,
+            # until close to the end.
+            part_left = self.expected_part_size - self.current_part_size
+            skip = min(part_left - self.separator_len - 4, end - pos)
+            if skip > 0:
+                pieces.append(memoryview(data)[pos : pos + skip])
+                pos += skip
+                self.body_line_start = False
 
-        lines = self._separate_newlines(chunk_lines)
-
-        previous_newline = b""
+        if self.buffer:
+            # We held back the end of the last chunk, as it may have been the
+            # start of a delimiter line. Glue just enough of the new chunk on
+            # to it to settle that, without copying the whole chunk.
+            tail = self.buffer
+            self.buffer = bytearray()
+            glue_end = min(end, pos + self.separator_len + 6)
+            glue = tail + data[pos:glue_end]
 
-        for line, newline in lines:
-            # Handle the case where our last chunk of data ended
-            # ambigiously.
-            if self.last_partial_line is not None:
-                line = self.last_partial_line + line
-                self.last_partial_line = None
+            data_end, resume, found = self._scan_body(glue, 0, len(glue))
 
-            if line == self.terminator:
-                self.state = States.FINISHED
-                self.current_part_size = 0
-                self.expected_part_size = None
-                break
+            if data_end >= len(tail) and glue_end < end:
+                # No delimiter starts in the held back bytes, they are body
+                # data. (The glue is longer than a delimiter line, so anything
+                # held back from it starts in the chunk.) Carry on scanning
+                # the chunk itself, as the end of the glue is not the end of
+                # the chunk, and says nothing about a delimiter found there.
+                pieces.append(tail)
+                self.body_line_start = False
 
-            elif line == self.separator:
-                self._buffer_chunk([(line, newline)])
-                self._buffer_chunk(lines)
-                self.state = States.BUILDING_HEADERS
-                self.current_part_size = 0
-                self.expected_part_size = None
-                break
             else:
-                if not newline:
-                    # It is impossible to tell the difference between
-                    # body data + CRLF + the beginning of the next seperator or
-                    # terminator, and random body data. For example, with a terminator
-                    # of "--terminator", we can't make a hard decision when our body chunk
-                    # is "somedata\r\n--term". We need to hold off on taking any specific
-                    # action, instead requesting more data.
-                    # We only make a distinction here when there is a possibility
-                    # that the chunk could actually be a separator or terminator,
-                    # which is when the line is shorter than the sep / term.
-                    # Anything else would either pass/fail the sep/term check, or
-                    # could not be a sep/term.
-                    if len(line) < self.separator_len:
-                        self.last_partial_line = line
-                        self.state = States.BUILDING_BODY_NEED_DATA
+                # Everything was settled within the glued bytes.
+                if data_end:
+                    pieces.append(glue[:data_end])
+                    self.body_line_start = False
+                if found is None:
+                    self.buffer = glue[resume:]
+                    pos = end
+                elif resume >= len(tail):
+                    pos += resume - len(tail)
                 else:
-                    self._regulate_content_length(len(line))
-                    part_data_buffer += previous_newline + line
-                    previous_newline = newline
-
-        if part_data_buffer:
-            if not self.state in (States.BUILDING_HEADERS, States.FINISHED):
-                # we haven't hit an end condition for the current part.
-                self.state = States.BUILDING_BODY_NEED_DATA
-            return PartData(raw=part_data_buffer, size=len(part_data_buffer))
-
-    def _separate_newlines(self, lines) -> Generator[Tuple[bytes, bytes], None, None]:
-        """
-        Iterate over a binary file-like object line by line. Each line is
-        returned as a (line, line_ending) tuple.
-        """
-        for line in lines:
-            if line.endswith(b"\r\n"):
-                yield line[:-2], b"\r\n"
-            elif line.endswith(b"\n"):
-                yield line[:-1], b"\n"
-            elif line.endswith(b"\r"):
-                yield line[:-1], b"\r"
+                    # The separator line starts in the held back bytes.
+                    self.buffer = tail[resume:]
+                self._end_part_data(pieces, found)
+                return pos
+
+        data_end, resume, found = self._scan_body(data, pos, end)
+
+        if data_end > pos:
+            pieces.append(memoryview(data)[pos:data_end])
+            self.body_line_start = False
+        if found is None:
+            self.buffer = bytearray(data[resume:end])
+            resume = end
+
+        self._end_part_data(pieces, found)
+        return resume
+
+    def _end_part_data(self, pieces, found) -> None:
+        """
+        Emit the body pieces found, and move the parser on to the state the
+        delimiter search ended in.
+        """
+        if pieces:
+            size = 0
+            for piece in pieces:
+                size += len(piece)
+            self._regulate_content_length(size)
+            if self.stats is not None:
+                self.stats.body_bytes += size
+            if self.skip_body:
+                pass
+            elif self.part_decoder is None:
+                self._emit_data(pieces)
             else:
-                yield line or b"", b""
+                decoded = self.part_decoder.decode(pieces)
+                if decoded:
+                    self._emit_data([decoded])
+
+        if found is States.BUILDING_HEADERS or found is States.FINISHED:
+            # Any of the separator line held back is a header byte of the
+            # next part.
+            self.part_header_bytes = len(self.buffer)
+            if self.skip_body:
+                # The decoder has not seen all of the data, so there is
+                # nothing sensible to flush.
+                self.part_decoder = None
+            elif self.part_decoder is not None:
+                decoded = self.part_decoder.flush()
+                self.part_decoder = None
+                if decoded:
+                    self._emit_data([decoded])
+
+            self.state = found
+            self.current_part_size = 0
+            self.expected_part_size = None
+            self._emit_part_end()
+            self.skip_body = False
+        else:
+            # we haven't hit an end condition for the current part.
+            self.state = States.BUILDING_BODY_NEED_DATA
+
+    def _emit_part(self, headers) -> None:
+        """
+        Queue a Part for the headers of a part.
+        """
+        self.events_queue.append(
+            Part(charset=self.charset, sink_factory=self.sink_factory, headers=headers)
+        )
 
-    def _buffer_chunk(self, chunk_lines) -> None:
+    def _emit_data(self, pieces) -> None:
         """
-        Take an iterator like Iterable[Tuple[bytes, bytes]] and store them.
-        For convenience's sake, we join everything back up as a singular byte string
-        for reparsing later.
+        Queue the body pieces found joined up in a PartData object. In zero
+        copy mode, each piece is queued as a PartData object of its own.
         """
-        self.buffer += b"".join((l + nl) for l, nl in chunk_lines)
+        if self.zero_copy:
+            for piece in pieces:
+                view = memoryview(piece).toreadonly()
+                self.events_queue.append(PartData(raw=view, size=len(view)))
+            if self.stats is not None:
+                self.stats.part_data_events += len(pieces)
+            return
+
+        part_data_buffer = bytearray()
+        for piece in pieces:
+            part_data_buffer += piece
+
+        self.events_queue.append(
+            PartData(raw=part_data_buffer, size=len(part_data_buffer))
+        )
+        if self.stats is not None:
+            self.stats.part_data_events += 1
+
+    def _emit_part_end(self) -> None:
+        """
+        Called when the body of a part ends. The queue has no event for it.
+        """
+
+    def _emit_need_data(self) -> None:
+        self.events_queue.append(Events.NEED_DATA)
+
+    def _emit_finished(self) -> None:
+        self.events_queue.append(Events.FINISHED)
+
+    def _scan_body(self, data, pos, end) -> Tuple[int, int, Union[States, None]]:
+        """
+        Search data[pos:end] for the next delimiter line, which is a newline
+        followed by the separator or terminator line.
+
+        Returns a (data_end, resume, found) tuple. data[pos:data_end] is
+        body data. found is States.BUILDING_HEADERS when a separator line
+        starts at resume, or States.FINISHED when the terminator line was
+        found. When found is None, data[resume:end] may be the start of a
+        delimiter line, and has to be held back until more data arrives.
+        """
+        separator = self.separator
+        separator_len = self.separator_len
+        search_from = pos
+
+        while True:
+            index = data.find(separator, search_from, end)
+            if index == -1:
+                break
+
+            # The separator must start a line. The preceding newline
+            # belongs to the delimiter, not the body.
+            if index == pos and self.body_line_start:
+                newline = index
+            elif index > pos and data[index - 1] in _NEWLINE_BYTES:
+                newline = index - 1
+                if data[newline] == _LF and newline > pos and data[newline - 1] == _CR:
+                    newline -= 1
+            else:
+                search_from = index + 1
+                continue
+
+            after = index + separator_len
+            if after + 2 > end:
+                if after < end and data[after] in _NEWLINE_BYTES:
+                    return newline, index, States.BUILDING_HEADERS
+                # Too little data to tell what this line is yet.
+                return newline, newline, None
+
+            if data[after] in _NEWLINE_BYTES:
+                return newline, index, States.BUILDING_HEADERS
+
+            if data[after] == _DASH and data[after + 1] == _DASH:
+                if after + 2 == end:
+                    # A terminator line without its newline ends the body,
+                    # unless the body's length says more is coming.
+                    if (
+                        self.content_length is not None
+                        and self.total_size < self.content_length
+                    ):
+                        return newline, newline, None
+                    return newline, index, States.FINISHED
+                if data[after + 2] in _NEWLINE_BYTES:
+                    return newline, index, States.FINISHED
+
+            # Body data that happens to contain the separator.
+            search_from = index + 1
+
+        # It is impossible to tell the difference between body data + CRLF +
+        # the beginning of the next separator or terminator, and random body
+        # data. For example, with a terminator of "--terminator", we can't
+        # make a hard decision when our body chunk is "somedata\r\n--term".
+        # Hold back anything from a newline close enough to the end of the
+        # data to be the start of a delimiter line.
+        if (
+            self.body_line_start
+            and end - pos < separator_len
+            and separator.startswith(data[pos:end])
+        ):
+            return pos, pos, None
+
+        window = max(pos, end - separator_len - 2)
+        cr = data.find(b"\r", window, end)
+        lf = data.find(b"\n", window, end)
+        if cr == -1 and lf == -1:
+            return end, end, None
+
+        hold = lf if cr == -1 else cr if lf == -1 else min(cr, lf)
+        if data[hold] == _LF and hold > pos and data[hold - 1] == _CR:
+            hold -= 1
+        return hold, hold, None
 
     def _regulate_content_length(self, line_size) -> None:
+        self.current_part_size += line_size
         if self.expected_part_size is not None:
-            self.current_part_size += line_size
             if self.current_part_size > self.expected_part_size:
                 raise MalformedData("Size of part body exceeds part Content-Length.")
+        if self.max_part_size is not None:
+            if self.current_part_size > self.max_part_size:
+                raise PartTooLarge("Part body exceeds %d bytes." % self.max_part_size)
+
+
+class _HeadersOnlyParser(MultipartParser):
+    """
+    Queues only the Part events of a body, skipping every part's body.
+    Part Content-Length headers are never trusted, so a part can't hide
+    the ones after it.
+    """
+
+    def __init__(self, boundary, **kwargs):
+        kwargs["trust_part_length"] = False
+        super().__init__(boundary, **kwargs)
+
+    def _emit_part(self, headers) -> None:
+        super()._emit_part(headers)
+        self.skip_body = True
+
+
+def parse_part_headers(source, boundary, **kwargs) -> List[Part]:
+    """
+    Return the Parts of a multipart body, with their headers but without
+    their bodies, which are only scanned for the next boundary. source is
+    the body, as bytes or an iterable of chunks. Extra keyword arguments go
+    to MultipartParser.
+
+    Errors from the parser, such as a LimitExceeded subclass, are raised as
+    they are. UnexpectedExit is raised if source ends before the terminator
+    line.
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        source = (source,)
+
+    parser = _HeadersOnlyParser(boundary, **kwargs)
+    parts = []
+    for chunk in source:
+        parser.recv(chunk)
+        for event in parser:
+            if isinstance(event, Part):
+                parts.append(event)
+        if parser.state is States.FINISHED:
+            return parts
+
+    raise UnexpectedExit("Unexpected end. No terminator line parsed.")
+
+
+class MultipartCallbackParser(MultipartParser):
+    """
+    A push style parser. Instead of queueing Part and PartData objects for
+    next_event, it calls handlers inline as it parses each chunk:
+
+    * on_part_begin(headerlist) with the list of (name, value) header pairs
+      of a part, once its headers are complete.
+    * on_data(view) with a read only memoryview of body data. The view is
+      only valid for the duration of the call.
+    * on_part_end() when the body of a part ends.
+    * on_finish() once the terminator line has been parsed.
+
+    Handlers may be left out. Nothing is queued, and no Part or PartData
+    objects are made.
+    """
+
+    def __init__(
+        self,
+        boundary,
+        on_part_begin=None,
+        on_data=None,
+        on_part_end=None,
+        on_finish=None,
+        **kwargs
+    ):
+        super().__init__(boundary, **kwargs)
+        self.on_part_begin = on_part_begin
+        self.on_data = on_data
+        self.on_part_end = on_part_end
+        self.on_finish = on_finish
+        self.finish_called = False
+
+    def reset(self, boundary, content_length=None) -> None:
+        super().reset(boundary, content_length)
+        self.finish_called = False
+
+    def _emit_part(self, headers) -> None:
+        if self.on_part_begin is not None:
+            self.on_part_begin(headers.headerlist)
+
+    def _emit_data(self, pieces) -> None:
+        if self.stats is not None:
+            self.stats.part_data_events += len(pieces)
+        if self.on_data is not None:
+            for piece in pieces:
+                self.on_data(memoryview(piece).toreadonly())
+
+    def _emit_part_end(self) -> None:
+        if self.on_part_end is not None:
+            self.on_part_end()
+
+    def _emit_need_data(self) -> None:
+        pass
+
+    def _emit_finished(self) -> None:
+        if not self.finish_called:
+            self.finish_called = True
+            if self.on_finish is not None:
+                self.on_finish()
@@ -0,0 +1,132 @@
+__all__ = ["PartPipeline"]
+
+
+import hashlib
+import zlib
+from concurrent.futures import Future, ThreadPoolExecutor
+from queue import Queue
+
+from typing import List
+
+from .parser import Part
+
+
+_END = object()
+
+
+class PartPipeline:
+    """
+    Hashes and stores the bodies of parts on a pool of threads, so that the
+    thread driving the parser can carry on parsing meanwhile. hashlib and
+    zlib release the GIL for large buffers, so this uses several cores.
+
+    Call begin with each Part event, and feed with each PartData event that
+    follows it. Each part's data is hashed with every algorithm named in
+    algorithms, and with CRC32 if crc32 is set, and written to a sink made
+    by the part's sink_factory. Once a part is done, its sink, size and
+    digests (a dict of hex digests, by algorithm name) are set on it, and
+    Part.file, Part.raw and Part.save_as work as if it had been buffered.
+
+    At most max_queued chunks of a part wait to be processed. Beyond that,
+    feed blocks until the workers catch up.
+
+        with PartPipeline(crc32=True) as pipeline:
+            for event in parser:
+                if isinstance(event, Part):
+                    pipeline.begin(event)
+                elif isinstance(event, PartData):
+                    pipeline.feed(event)
+            parts = pipeline.finish()
+    """
+
+    def __init__(self, algorithms=("sha256",), crc32=False, workers=4, max_queued=16):
+        self.algorithms = tuple(algorithms)
+        for name in self.algorithms:
+            # Fail here, rather than in a worker, for unknown algorithms.
+            hashlib.new(name)
+        self.crc32 = crc32
+        self.max_queued = max_queued
+        self.executor = ThreadPoolExecutor(workers, thread_name_prefix="PartPipeline")
+        self.futures = []
+        self.chunks = None
+
+    def begin(self, part) -> Future:
+        """
+        Start processing a part, ending the one before it. Returns a Future
+        giving the part once it is done.
+        """
+        self._end_part()
+        self.chunks = Queue(self.max_queued)
+        future = self.executor.submit(self._process, part, self.chunks)
+        self.futures.append(future)
+        return future
+
+    def feed(self, part_data) -> None:
+        """ Queue the data of a PartData event for the current part. """
+        if self.chunks is None:
+            raise RuntimeError("No part has begun.")
+
+        raw = part_data.raw
+        if isinstance(raw, memoryview):
+            # Zero copy data is only valid until the parser is fed again.
+            raw = bytes(raw)
+        self.chunks.put(raw)
+
+    def finish(self) -> List[Part]:
+        """
+        End the last part, wait for every part begun to be done, and return
+        them. Raises the first error any of them ran into.
+        """
+        self._end_part()
+        futures, self.futures = self.futures, []
+        return [future.result() for future in futures]
+
+    def close(self) -> None:
+        self._end_part()
+        self.executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.close()
+
+    def _end_part(self) -> None:
+        if self.chunks is not None:
+            self.chunks.put(_END)
+            self.chunks = None
+
+    def _process(self, part, chunks):
+        crc = 0
+        size = 0
+        sink = None
+
+        try:
+            hashes = [hashlib.new(name) for name in self.algorithms]
+            sink = part.sink_factory()
+            while True:
+                data = chunks.get()
+                if data is _END:
+                    break
+                for h in hashes:
+                    h.update(data)
+                if self.crc32:
+                    crc = zlib.crc32(data, crc)
+                sink.write(data)
+                size += len(data)
+        except BaseException:
+            if sink is not None:
+                sink.close()
+            # Keep taking the part's data, so feed never blocks on it.
+            while chunks.get() is not _END:
+                pass
+            raise
+
+        digests = {h.name: h.hexdigest() for h in hashes}
+        if self.crc32:
+            digests["crc32"] = "%08x" % crc
+
+        part.sink = sink
+        part.size = size
+        part.digests = digests
+        return part
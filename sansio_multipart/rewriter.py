@@ -0,0 +1,123 @@
+__all__ = ["MultipartRewriter"]
+
+
+from .parser import MultipartParser, Part, States
+from .utils import check_header_value
+
+
+class MultipartRewriter(MultipartParser):
+    """
+    Rewrites a multipart body as it streams through, for proxies that
+    forward uploads after dropping or changing some of their parts.
+
+    Each chunk given to rewrite() is parsed, and the output it completes is
+    returned straight away, so only a partial line or delimiter is ever
+    held back.
+
+    on_part is called with a Part as soon as the headers of each part are
+    complete, and decides what happens to the part:
+
+    * None or True: the part is passed through as it arrived, headers and
+      body.
+    * False: the part is dropped, headers and body.
+    * An iterable of (name, value) pairs: the part's headers are replaced
+      with these, and its body is passed through. Names or values
+      containing CR, LF or NUL raise ValueError.
+
+    Delimiter lines are written with CRLF line ends. Everything else of the
+    parts that are kept is passed through byte for byte.
+    """
+
+    def __init__(self, boundary, on_part=None, **kwargs):
+        super().__init__(boundary, **kwargs)
+        self.on_part = on_part
+        self.output = []
+        self.raw_headers = bytearray()
+        self.part_action = None
+        self.dropping = False
+        self.finish_written = False
+
+    def rewrite(self, chunk) -> bytes:
+        """
+        Parse chunk, and return the output it completes.
+        """
+        self._queue_events(chunk)
+        output = b"".join(self.output)
+        self.output.clear()
+        return output
+
+    def reset(self, boundary, content_length=None) -> None:
+        super().reset(boundary, content_length)
+        self.output.clear()
+        self.raw_headers = bytearray()
+        self.part_action = None
+        self.dropping = False
+        self.finish_written = False
+
+    def _parse_part(self, data, pos, end) -> int:
+        if not self.raw_headers:
+            # The start of the separator line may have been held back while
+            # looking for the end of the last part.
+            self.raw_headers += self.buffer
+        start = pos
+        pos = super()._parse_part(data, pos, end)
+        self.raw_headers += memoryview(data)[start:pos]
+
+        if self.state is States.BUILDING_BODY:
+            self._write_head(self.part_action)
+            self.raw_headers = bytearray()
+            self.part_action = None
+        return pos
+
+    def _write_head(self, action) -> None:
+        if action is None or action is True:
+            raw = self.raw_headers
+            # Leave out any blank lines in front of the first part.
+            raw = raw[raw.find(self.separator) :]
+            if self.skip_lf:
+                # The blank line ended on a CR at the end of the chunk, and
+                # its LF comes with the next one.
+                raw += b"\n"
+            self.output.append(raw)
+            self.dropping = False
+
+        elif action is False:
+            self.dropping = True
+
+        else:
+            head = "".join(
+                "%s: %s\r\n" % (check_header_value(name), check_header_value(value))
+                for name, value in action
+            )
+            self.output.append(self.separator + b"\r\n")
+            self.output.append(head.encode(self.charset) + b"\r\n")
+            self.dropping = False
+
+    def _emit_part(self, headers) -> None:
+        # The raw header bytes are only complete once _parse_part returns.
+        if self.on_part is None:
+            self.part_action = None
+        else:
+            part = Part(
+                charset=self.charset, sink_factory=self.sink_factory, headers=headers
+            )
+            self.part_action = self.on_part(part)
+
+    def _emit_data(self, pieces) -> None:
+        if self.stats is not None:
+            self.stats.part_data_events += len(pieces)
+        if not self.dropping:
+            self.output.extend(pieces)
+
+    def _emit_part_end(self) -> None:
+        if not self.dropping:
+            self.output.append(b"\r\n")
+        self.dropping = False
+
+    def _emit_need_data(self) -> None:
+        pass
+
+    def _emit_finished(self) -> None:
+        if not self.finish_written:
+            self.finish_written = True
+            self.output.append(self.terminator + b"\r\n")
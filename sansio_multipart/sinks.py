@@ -0,0 +1,134 @@
+__all__ = ["SpooledSink", "RangeFileSink"]
+
+
+import os
+from io import BytesIO
+from shutil import copyfileobj
+from tempfile import TemporaryFile
+
+from .errors import LimitExceeded
+
+
+class SpooledSink:
+    """
+    Stores the data of a part in memory, moving it to a temporary file on
+    disk once it grows past mem_limit bytes. Writing more than disk_limit
+    bytes raises LimitExceeded.
+
+    Any object with the same write / getvalue / close methods and file /
+    size attributes can stand in for it, see Part.
+    """
+
+    def __init__(self, mem_limit=2 ** 18, disk_limit=2 ** 30):
+        self.mem_limit = mem_limit
+        self.disk_limit = disk_limit
+        self.file = BytesIO()
+        self.size = 0
+
+    def is_buffered(self) -> bool:
+        """ Return true if the data is fully buffered in memory. """
+        return isinstance(self.file, BytesIO)
+
+    def write(self, data) -> None:
+        size = self.size + len(data)
+
+        if size > self.disk_limit:
+            raise LimitExceeded("Disk limit reached.")
+
+        if size > self.mem_limit and self.is_buffered():
+            self._spool()
+
+        self.file.seek(0, 2)
+        self.file.write(data)
+        self.size = size
+
+    def getvalue(self) -> bytes:
+        """ Return all of the data written so far. """
+        if self.is_buffered():
+            return self.file.getvalue()
+
+        position = self.file.tell()
+        try:
+            self.file.seek(0)
+            return self.file.read()
+        finally:
+            self.file.seek(position)
+
+    def save_as(self, path) -> int:
+        """ Copy the data written so far to a file at path. """
+        position = self.file.tell()
+        try:
+            self.file.seek(0)
+            with open(path, "wb") as f:
+                copyfileobj(self.file, f)
+        finally:
+            self.file.seek(position)
+        return self.size
+
+    def close(self) -> None:
+        self.file.close()
+
+    def _spool(self) -> None:
+        """ Move the data buffered in memory to a temporary file. """
+        tmp = TemporaryFile(mode="w+b")
+        tmp.write(self.file.getbuffer())
+        self.file.close()
+        self.file = tmp
+
+
+class RangeFileSink:
+    """
+    Writes byte ranges straight to where they belong in a file of a known
+    size, so ranges can arrive in any order, from any number of responses,
+    without being buffered. The file is created if need be, and space for
+    size bytes is allocated up front.
+
+    write takes the RangeData events of a ByteRangesParser. pwrite writes
+    any data at an offset. Both are safe to call from several threads.
+    """
+
+    def __init__(self, path, size):
+        self.path = path
+        self.size = size
+        self.fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o666)
+        try:
+            self._preallocate()
+        except BaseException:
+            os.close(self.fd)
+            raise
+
+    def write(self, range_data) -> None:
+        self.pwrite(range_data.raw, range_data.offset)
+
+    def pwrite(self, data, offset) -> None:
+        view = memoryview(data)
+        if offset < 0 or offset + len(view) > self.size:
+            raise LimitExceeded("Range does not fit in %d bytes." % self.size)
+
+        while view:
+            written = os.pwrite(self.fd, view, offset)
+            view = view[written:]
+            offset += written
+
+    def close(self) -> None:
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.close()
+
+    def _preallocate(self) -> None:
+        """ Reserve the file's disk space, or at least set its size. """
+        if os.fstat(self.fd).st_size < self.size:
+            os.ftruncate(self.fd, self.size)
+        if hasattr(os, "posix_fallocate") and self.size:
+            try:
+                os.posix_fallocate(self.fd, 0, self.size)
+            except OSError:
+                # Not supported by every file system. The file has its size
+                # anyway.
+                pass
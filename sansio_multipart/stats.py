@@ -0,0 +1,41 @@
+__all__ = ["ParserStats"]
+
+
+class ParserStats:
+    """
+    Counters describing the work a MultipartParser has done. Pass stats=True
+    to the parser to have them kept, as MultipartParser.stats.
+
+    bytes_scanned counts input bytes the parser has moved past, up to the
+    start of the terminator line, and header_bytes those that were part of
+    separator lines and header segments. Bytes held back at the end of a
+    chunk are only counted once the next settles what they are, so neither
+    depends on how the body is chunked. bytes_buffered counts the bytes the
+    parser had to copy in to its own buffer to carry them over to the next
+    chunk, so it does. The *_seconds counters are the time spent parsing
+    headers and bodies.
+    """
+
+    __slots__ = (
+        "recv_calls",
+        "bytes_received",
+        "bytes_scanned",
+        "bytes_buffered",
+        "header_bytes",
+        "body_bytes",
+        "parts",
+        "part_data_events",
+        "header_seconds",
+        "body_seconds",
+    )
+
+    def __init__(self):
+        for name in self.__slots__:
+            setattr(self, name, 0)
+
+    def as_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self):
+        counters = ", ".join("%s=%r" % item for item in self.as_dict().items())
+        return "%s(%s)" % (type(self).__name__, counters)
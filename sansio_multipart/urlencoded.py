@@ -0,0 +1,171 @@
+__all__ = ["URLEncodedParser", "Field"]
+
+
+from collections import deque
+from dataclasses import dataclass
+from urllib.parse import unquote_to_bytes
+
+from typing import Union, Generator, List
+
+from .parser import Events, States
+from .errors import UnexpectedExit, MalformedData, FieldTooLarge
+
+
+@dataclass(frozen=True)
+class Field:
+    __slots__ = ("name", "value")
+
+    name: str
+    value: str
+
+
+class URLEncodedParser:
+    """
+    A sansio parser for application/x-www-form-urlencoded bodies, with the
+    same recv / next_event interface as MultipartParser. A Field event is
+    queued for each name=value pair as soon as the & after it arrives, so
+    only the field being received is ever buffered.
+
+    The format has no terminator. The body ends once content_length bytes
+    have been received, if given, or when recv is passed b"".
+    """
+
+    def __init__(self, content_length=None, charset="utf8", max_field_size=2 ** 16):
+        self.content_length = content_length
+        self.charset = charset
+        self.max_field_size = max_field_size
+
+        # An empty body is complete before anything is received.
+        self.state = States.FINISHED if content_length == 0 else States.BUILDING_BODY
+        self.events_queue = deque()
+
+        self.buffer = bytearray()
+        self.received = 0
+
+    def parts(self) -> List[Union[Field, Events]]:
+        return list(self)
+
+    def recv(self, chunk) -> None:
+        """
+        Queue any events parsing chunk may create. b"" ends the body.
+        """
+        self._queue_events(chunk)
+
+    def parse(self, chunk) -> List[Union[Field, Events]]:
+        """Queue events for the chunk, and return them as a list."""
+        self._queue_events(chunk)
+        return self.parts()
+
+    def next_event(self) -> Union[Field, Events]:
+        """
+        Return the next event from the queue.
+        If there is no event, request data, unless parsing is complete.
+        """
+        try:
+            return self.events_queue.popleft()
+        except IndexError:
+            if self.state is not States.FINISHED:
+                return Events.NEED_DATA
+            else:
+                return Events.FINISHED
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        if self.state is not States.FINISHED:
+            raise UnexpectedExit("Unexpected end. Body was not ended.")
+
+    def __iter__(self) -> Generator[Union[Field, Events], None, None]:
+        """
+        Yield all events in the queue.
+        """
+        while True:
+            try:
+                event = self.events_queue.popleft()
+            except IndexError:
+                break
+            else:
+                yield event
+
+    def _queue_events(self, chunk) -> None:
+        if self.state is States.ERROR:
+            raise RuntimeError("Cannot use parser in ERROR state.")
+
+        if self.state is States.FINISHED:
+            self.events_queue.append(Events.FINISHED)
+            return
+
+        if not isinstance(chunk, (bytes, bytearray)):
+            chunk = bytes(chunk)
+
+        try:
+            if not chunk:
+                length = self.content_length
+                if length is not None and self.received < length:
+                    raise UnexpectedExit("Body ended before its Content-Length.")
+                self._finish()
+                return
+
+            self.received += len(chunk)
+            if self.content_length is not None and self.received > self.content_length:
+                raise MalformedData("Body is longer than its Content-Length.")
+
+            pos = 0
+            while True:
+                separator = chunk.find(b"&", pos)
+                if separator == -1:
+                    break
+
+                if self.buffer:
+                    self._check_field_size(len(self.buffer) + separator - pos)
+                    self.buffer += memoryview(chunk)[pos:separator]
+                    field = self.buffer
+                    self.buffer = bytearray()
+                else:
+                    self._check_field_size(separator - pos)
+                    field = chunk[pos:separator]
+
+                self._queue_field(field)
+                pos = separator + 1
+
+            self._check_field_size(len(self.buffer) + len(chunk) - pos)
+            self.buffer += memoryview(chunk)[pos:]
+
+            if self.received == self.content_length:
+                self._finish()
+            else:
+                self.events_queue.append(Events.NEED_DATA)
+        except Exception:
+            self.state = States.ERROR
+            raise
+
+    def _finish(self) -> None:
+        if self.buffer:
+            self._queue_field(self.buffer)
+            self.buffer = bytearray()
+        self.state = States.FINISHED
+        self.events_queue.append(Events.FINISHED)
+
+    def _queue_field(self, field) -> None:
+        """
+        Decode a name=value pair and queue it as a Field. Like parse_qs with
+        keep_blank_values, empty pairs are skipped and a name without a value
+        gets an empty string.
+        """
+        if not field:
+            return
+
+        name, _, value = bytes(field).partition(b"=")
+        self.events_queue.append(
+            Field(name=self._unquote(name), value=self._unquote(value))
+        )
+
+    def _unquote(self, value) -> str:
+        return unquote_to_bytes(value.replace(b"+", b" ")).decode(
+            self.charset, "replace"
+        )
+
+    def _check_field_size(self, size) -> None:
+        if size > self.max_field_size:
+            raise FieldTooLarge("Field exceeds %d bytes." % self.max_field_size)
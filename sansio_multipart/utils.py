@@ -1,6 +1,7 @@
 __all__ = [
     "header_quote",
     "header_unquote",
+    "check_header_value",
     "parse_options_header",
     "to_bytes",
     "MultiDict",
@@ -8,6 +9,7 @@ __all__ = [
 
 
 import re
+from functools import lru_cache
 from collections.abc import MutableMapping as DictMixin
 
 
@@ -17,6 +19,16 @@ _quoted_string = r'"(?:\\.|[^"])*"'  # Quoted string
 _value = r"(?:[^%s]+|%s)" % (_special, _quoted_string)  # Save or quoted string
 _option = r"(?:;|^)\s*([^%s]+)\s*=\s*(%s)" % (_special, _value)
 _re_option = re.compile(_option)  # key=value part of an Content-Type like header
+_re_unsafe = re.compile(r"[\r\n\0]")  # Would end or corrupt a header line
+
+# Headers longer than this are parsed every time, rather than filling the
+# cache with one-offs.
+_cached_header_size = 1024
+
+
+@lru_cache(maxsize=1024)
+def _parse_options_cached(header):
+    return _parse_options(header)
 
 
 def header_quote(val):
@@ -26,6 +38,13 @@ def header_quote(val):
     return '"' + val.replace("\\", "\\\\").replace('"', '\\"') + '"'
 
 
+def check_header_value(val):
+    """ Return val, or raise ValueError if it would break out of a header line. """
+    if _re_unsafe.search(val):
+        raise ValueError("Header value contains CR, LF or NUL: %r" % val)
+    return val
+
+
 def header_unquote(val, filename=False):
     if val[0] == val[-1] == '"':
         val = val[1:-1]
@@ -42,15 +61,28 @@ def parse_options_header(header, options=None):
     if ";" not in header:
         return header.lower().strip(), {}
 
-    content_type, tail = header.split(";", 1)
+    if len(header) > _cached_header_size:
+        content_type, items = _parse_options(header)
+    else:
+        # Clients send the same few shapes of header over and over.
+        content_type, items = _parse_options_cached(header)
+
     options = options or {}
+    options.update(items)
+
+    return content_type, options
+
+
+def _parse_options(header):
+    content_type, tail = header.split(";", 1)
+    items = []
 
     for match in _re_option.finditer(tail):
         key = match.group(1).lower()
         value = header_unquote(match.group(2), key == "filename")
-        options[key] = value
+        items.append((key, value))
 
-    return content_type, options
+    return content_type, tuple(items)
 
 
 def to_bytes(data, encoding="utf8"):
@@ -2,14 +2,22 @@ __all__ = ["parse_form_data"]
 
 
 from io import BytesIO
-from urllib.parse import parse_qs
 
-from .parser import MultipartParser
+from .parser import MultipartParser, Part, Events
+from .urlencoded import URLEncodedParser
 from .utils import MultiDict, parse_options_header
-from .errors import MultipartError
-
-
-def parse_form_data(environ, charset="utf8", strict=False, **kwargs):
+from .errors import MultipartError, MalformedData, UnexpectedExit, LimitExceeded
+
+
+def parse_form_data(
+    environ,
+    charset="utf8",
+    strict=False,
+    block_size=2 ** 16,
+    mem_limit=2 ** 20,
+    memfile_limit=2 ** 18,
+    disk_limit=2 ** 30,
+):
     """ Parse form data from an environ dict and return a (forms, files) tuple.
         Both tuple values are dictionaries with the form-field name as a key
         (unicode) and lists as values (multiple values per key are possible).
@@ -22,6 +30,13 @@ def parse_form_data(environ, charset="utf8", strict=False, **kwargs):
         :param charset: The charset to use if unsure. (default: utf8)
         :param strict: If True, raise :exc:`MultipartError` on any parsing
                        errors. These are silently ignored by default.
+        :param block_size: Number of bytes to read from wsgi.input at a time.
+        :param mem_limit: Total number of bytes of the request to keep in
+                          memory.
+        :param memfile_limit: Number of bytes of a single part to keep in
+                              memory, before moving it to disk. Also the
+                              largest urlencoded field allowed.
+        :param disk_limit: Total number of bytes of the request to buffer.
     """
 
     forms, files = MultiDict(), MultiDict()
@@ -29,7 +44,10 @@ def parse_form_data(environ, charset="utf8", strict=False, **kwargs):
     try:
         if environ.get("REQUEST_METHOD", "GET").upper() not in ("POST", "PUT"):
             raise MultipartError("Request method other than POST or PUT.")
-        content_length = int(environ.get("CONTENT_LENGTH", "-1"))
+        try:
+            content_length = int(environ.get("CONTENT_LENGTH") or "-1")
+        except ValueError:
+            raise MalformedData("Invalid Content-Length header.")
         content_type = environ.get("CONTENT_TYPE", "")
 
         if not content_type:
@@ -37,7 +55,7 @@ def parse_form_data(environ, charset="utf8", strict=False, **kwargs):
 
         content_type, options = parse_options_header(content_type)
         stream = environ.get("wsgi.input") or BytesIO()
-        kwargs["charset"] = charset = options.get("charset", charset)
+        charset = options.get("charset", charset)
 
         if content_type == "multipart/form-data":
             boundary = options.get("boundary", "")
@@ -45,30 +63,37 @@ def parse_form_data(environ, charset="utf8", strict=False, **kwargs):
             if not boundary:
                 raise MultipartError("No boundary for multipart/form-data.")
 
-            for part in MultipartParser(stream, boundary, content_length, **kwargs):
+            parser = MultipartParser(
+                boundary,
+                content_length,
+                charset=charset,
+                mem_limit=memfile_limit,
+                disk_limit=disk_limit,
+            )
+            parts = _read_parts(
+                parser, stream, content_length, block_size, mem_limit, disk_limit
+            )
+
+            for part in parts:
                 if part.filename or not part.is_buffered():
                     files[part.name] = part
                 else:  # TODO: Big form-fields are in the files dict. really?
                     forms[part.name] = part.value
+                    part.close()
 
         elif content_type in (
             "application/x-www-form-urlencoded",
             "application/x-url-encoded",
         ):
-            mem_limit = kwargs.get("mem_limit", 2 ** 20)
-            if content_length > mem_limit:
-                raise MultipartError("Request too big. Increase MAXMEM.")
-
-            data = stream.read(mem_limit).decode(charset)
-
-            if stream.read(1):  # These is more that does not fit mem_limit
-                raise MultipartError("Request too big. Increase MAXMEM.")
-
-            data = parse_qs(data, keep_blank_values=True)
-
-            for key, values in data.items():
-                for value in values:
-                    forms[key] = value
+            parser = URLEncodedParser(
+                content_length if content_length >= 0 else None,
+                charset=charset,
+                max_field_size=memfile_limit,
+            )
+
+            fields = _read_fields(parser, stream, content_length, block_size, mem_limit)
+            for field in fields:
+                forms[field.name] = field.value
         else:
             raise MultipartError("Unsupported content type.")
 
@@ -77,3 +102,88 @@ def parse_form_data(environ, charset="utf8", strict=False, **kwargs):
             raise
 
     return forms, files
+
+
+def _read_parts(parser, stream, content_length, block_size, mem_limit, disk_limit):
+    """
+    Feed the parser from stream, block_size bytes at a time and no more than
+    content_length bytes in total (if known), buffering each part as it goes.
+    Return the list of buffered parts once the terminator has been parsed.
+    On an error, the parts buffered so far are closed.
+    """
+    parts = []
+    part = None
+    remaining = content_length
+    mem_used = disk_used = 0
+
+    try:
+        while True:
+            event = parser.next_event()
+
+            if event is Events.NEED_DATA:
+                if remaining < 0:
+                    chunk = stream.read(block_size)
+                else:
+                    chunk = stream.read(min(block_size, remaining))
+                    remaining -= len(chunk)
+
+                if not chunk:
+                    raise UnexpectedExit("Unexpected end of request body.")
+                parser.recv(chunk)
+
+            elif event is Events.FINISHED:
+                return parts
+
+            elif isinstance(event, Part):
+                part = event
+                parts.append(part)
+
+            else:
+                in_memory = part.size if part.is_buffered() else 0
+                part.buffer(event)
+
+                disk_used += event.size
+                if disk_used > disk_limit:
+                    raise LimitExceeded("Disk limit reached.")
+
+                mem_used += (part.size if part.is_buffered() else 0) - in_memory
+                if mem_used > mem_limit:
+                    raise LimitExceeded("Memory limit reached.")
+    except BaseException:
+        # The parts are never handed out, so close any spooled to disk.
+        for part in parts:
+            part.close()
+        raise
+
+
+def _read_fields(parser, stream, content_length, block_size, mem_limit):
+    """
+    Feed the urlencoded parser from stream, block_size bytes at a time and
+    no more than content_length bytes in total (if known), yielding each
+    field as soon as it has been parsed. Raise LimitExceeded if the fields
+    add up to more than mem_limit bytes.
+    """
+    remaining = content_length
+    mem_used = 0
+
+    while True:
+        event = parser.next_event()
+
+        if event is Events.NEED_DATA:
+            # The parser finishes by itself once content_length bytes
+            # have been fed, and b"" ends the body otherwise.
+            if remaining < 0:
+                parser.recv(stream.read(block_size))
+            else:
+                chunk = stream.read(min(block_size, remaining))
+                remaining -= len(chunk)
+                parser.recv(chunk)
+
+        elif event is Events.FINISHED:
+            return
+
+        else:
+            mem_used += len(event.name) + len(event.value)
+            if mem_used > mem_limit:
+                raise LimitExceeded("Memory limit reached.")
+            yield event
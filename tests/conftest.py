@@ -0,0 +1,61 @@
+from sansio_multipart import MultipartParser, Part, PartData, Events
+
+
+BOUNDARY = "bnd"
+
+
+def part(name, data, headers=b"", boundary=b"bnd", newline=b"\r\n"):
+    """
+    The separator line, header segment and body of a form-data part.
+    headers are any more header lines, each with its newline.
+    """
+    head = b"--%s%sContent-Disposition: form-data; name=%s%s" % (
+        boundary,
+        newline,
+        name,
+        newline,
+    )
+    return head + headers + newline + data + newline
+
+
+def body(*parts, boundary=b"bnd", newline=b"\r\n", terminator=None):
+    """
+    Build a body from (name, data) pairs, or parts already built by part().
+    """
+    out = b""
+    for p in parts:
+        if isinstance(p, tuple):
+            p = part(*p, boundary=boundary, newline=newline)
+        out += p
+    if terminator is None:
+        terminator = b"--%s--%s" % (boundary, newline)
+    return out + terminator
+
+
+def splits(data):
+    """ Every way of splitting data into two chunks. """
+    for i in range(len(data) + 1):
+        yield [data[:i], data[i:]]
+
+
+def chunked(data, size):
+    """ data in chunks of size bytes. """
+    return [data[i : i + size] for i in range(0, len(data), size)]
+
+
+def collect(chunks, boundary=BOUNDARY, **kwargs):
+    """
+    Feed chunks to a parser, and return its parts as a list of
+    (name, data) pairs, checking it finished.
+    """
+    parser = MultipartParser(boundary, **kwargs)
+    parts = []
+    for chunk in chunks:
+        parser.recv(chunk)
+        for event in parser:
+            if isinstance(event, Part):
+                parts.append([event.name, b""])
+            elif isinstance(event, PartData):
+                parts[-1][1] += bytes(event.raw)
+    assert parser.next_event() is Events.FINISHED
+    return [tuple(p) for p in parts]
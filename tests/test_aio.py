@@ -0,0 +1,140 @@
+import asyncio
+
+import pytest
+
+from sansio_multipart import aparse, Part, PartData
+from sansio_multipart.errors import UnexpectedExit
+
+
+CHUNKS = [
+    b"--bnd\r\nContent-Disposition: form-data; name=a\r\n\r\nfirst",
+    b"\r\n--bnd\r\nContent-Disposition: form-data; name=b\r\n\r\nsecond",
+    b"\r\n--bnd--\r\n",
+]
+DATA = b"".join(CHUNKS)
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+async def collect(events, log=None):
+    parts = []
+    async for event in events:
+        if isinstance(event, Part):
+            parts.append([event.name, b""])
+        elif isinstance(event, PartData):
+            parts[-1][1] += bytes(event.raw)
+        if log is not None:
+            log.append(type(event).__name__)
+    return [tuple(part) for part in parts]
+
+
+class FakeStream:
+    """ Returns CHUNKS one read at a time, logging each read. """
+
+    def __init__(self, log):
+        self.chunks = list(CHUNKS)
+        self.log = log
+
+    async def read(self, size):
+        self.log.append("read")
+        if not self.chunks:
+            return b""
+        chunk = self.chunks.pop(0)
+        if len(chunk) > size:
+            chunk, rest = chunk[:size], chunk[size:]
+            self.chunks.insert(0, rest)
+        return chunk
+
+
+def test_reads_only_once_events_are_consumed():
+    log = []
+    parts = run(collect(aparse(FakeStream(log), "bnd"), log))
+    assert parts == [("a", b"first"), ("b", b"second")]
+    # Each read comes only once every event from the one before is taken.
+    assert log == ["read", "Part", "PartData", "read", "Part", "PartData", "read"]
+
+
+def test_slow_consumer_stops_reading():
+    async def main():
+        log = []
+        events = aparse(FakeStream(log), "bnd")
+        assert isinstance(await events.__anext__(), Part)
+        await asyncio.sleep(0)
+        assert log == ["read"]
+        await events.aclose()
+
+    run(main())
+
+
+def test_stream_reader_content_length():
+    async def main():
+        stream = asyncio.StreamReader()
+        stream.feed_data(DATA + b"next request")
+        stream.feed_eof()
+        parts = await collect(aparse(stream, "bnd", content_length=len(DATA)))
+        return parts, await stream.read()
+
+    parts, rest = run(main())
+    assert parts == [("a", b"first"), ("b", b"second")]
+    assert rest == b"next request"
+
+
+def test_stream_reader_small_block_size():
+    async def main():
+        stream = asyncio.StreamReader()
+        stream.feed_data(DATA)
+        stream.feed_eof()
+        return await collect(aparse(stream, "bnd", block_size=3))
+
+    assert run(main()) == [("a", b"first"), ("b", b"second")]
+
+
+def test_stream_reader_truncated():
+    async def main():
+        stream = asyncio.StreamReader()
+        stream.feed_data(DATA[:-5])
+        stream.feed_eof()
+        await collect(aparse(stream, "bnd"))
+
+    with pytest.raises(UnexpectedExit):
+        run(main())
+
+
+def receiver(messages):
+    messages = list(messages)
+
+    async def receive():
+        return messages.pop(0)
+
+    return receive
+
+
+def test_asgi():
+    messages = [
+        {"type": "http.request", "body": chunk, "more_body": True} for chunk in CHUNKS
+    ]
+    # Empty messages are skipped, and the last one ends the body.
+    messages.insert(1, {"type": "http.request", "body": b"", "more_body": True})
+    messages.append({"type": "http.request", "more_body": False})
+    parts = run(collect(aparse(receiver(messages), "bnd")))
+    assert parts == [("a", b"first"), ("b", b"second")]
+
+
+def test_asgi_body_ends_early():
+    messages = [
+        {"type": "http.request", "body": CHUNKS[0], "more_body": True},
+        {"type": "http.request", "body": CHUNKS[1]},
+    ]
+    with pytest.raises(UnexpectedExit):
+        run(collect(aparse(receiver(messages), "bnd")))
+
+
+def test_asgi_disconnect():
+    messages = [
+        {"type": "http.request", "body": CHUNKS[0], "more_body": True},
+        {"type": "http.disconnect"},
+    ]
+    with pytest.raises(UnexpectedExit):
+        run(collect(aparse(receiver(messages), "bnd")))
@@ -0,0 +1,110 @@
+import subprocess
+import sys
+from multiprocessing.shared_memory import SharedMemory
+
+import pytest
+
+from sansio_multipart import parse_many, sniff_boundary
+from sansio_multipart import batch
+from sansio_multipart.errors import MalformedData
+
+from conftest import body
+
+
+ITEMS = [
+    body((b"f0", b"x" * i), (b"f1", b"value %d" % i), boundary=b"b%d" % i)
+    for i in range(12)
+]
+
+
+def bodies(result):
+    return [bytes(part.body(result.item)) for part in result.parts]
+
+
+def test_ordered():
+    results = list(parse_many(ITEMS, workers=2))
+    assert [result.index for result in results] == list(range(len(ITEMS)))
+    for i, result in enumerate(results):
+        assert result.error is None
+        assert bodies(result) == [b"x" * i, b"value %d" % i]
+
+
+def test_unordered():
+    results = list(parse_many(ITEMS, workers=2, ordered=False))
+    assert sorted(result.index for result in results) == list(range(len(ITEMS)))
+    for result in results:
+        assert bodies(result) == [b"x" * result.index, b"value %d" % result.index]
+
+
+def test_paths(tmp_path):
+    paths = []
+    for i, item in enumerate(ITEMS[:3]):
+        path = tmp_path / ("%d.bin" % i)
+        path.write_bytes(item)
+        paths.append(str(path))
+    paths.append(str(tmp_path / "empty.bin"))
+    (tmp_path / "empty.bin").write_bytes(b"")
+
+    results = list(parse_many(paths, workers=2))
+    for i, result in enumerate(results[:3]):
+        assert result.item == paths[i]
+        assert [bytes(part.body(ITEMS[i])) for part in result.parts] == [
+            b"x" * i,
+            b"value %d" % i,
+        ]
+    assert isinstance(results[-1].error, MalformedData)
+    assert results[-1].parts is None
+
+
+def test_errors_are_per_item():
+    items = [ITEMS[0], b"not multipart", ITEMS[1][:-5], ITEMS[2]]
+    results = list(parse_many(items, workers=2))
+    assert results[0].error is None
+    assert isinstance(results[1].error, MalformedData)
+    assert results[2].error is not None
+    assert results[3].error is None
+    assert bodies(results[3]) == [b"xx", b"value 2"]
+
+
+def test_shared_memory_freed_on_early_close(monkeypatch):
+    names = []
+
+    class RecordingSharedMemory(SharedMemory):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            if kwargs.get("create"):
+                names.append(self.name)
+
+    monkeypatch.setattr(batch, "SharedMemory", RecordingSharedMemory)
+
+    results = parse_many(ITEMS * 4, workers=2)
+    assert next(results).error is None
+    results.close()
+
+    assert len(names) > 1
+    for name in names:
+        with pytest.raises(FileNotFoundError):
+            SharedMemory(name)
+
+
+def test_sniff_boundary():
+    assert sniff_boundary(b"\r\n--abc\r\nrest") == b"abc"
+    with pytest.raises(MalformedData):
+        sniff_boundary(b"abc\r\n")
+
+
+def test_imported_lazily():
+    code = (
+        "import sys, sansio_multipart as m\n"
+        "assert 'sansio_multipart.batch' not in sys.modules\n"
+        "assert 'sansio_multipart.pipeline' not in sys.modules\n"
+        "assert m.parse_many and m.PartPipeline\n"
+        "assert 'sansio_multipart.batch' in sys.modules\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+    import sansio_multipart
+
+    assert sansio_multipart.sniff_boundary is batch.sniff_boundary
+    with pytest.raises(AttributeError):
+        sansio_multipart.missing
@@ -0,0 +1,105 @@
+import pytest
+
+from sansio_multipart import (
+    ByteRangesParser,
+    RangePart,
+    RangeData,
+    RangeFileSink,
+    Events,
+)
+from sansio_multipart.byteranges import parse_content_range
+from sansio_multipart.errors import MalformedData, LimitExceeded
+
+from conftest import chunked
+
+
+RESOURCE = bytes(range(256)) + b"\r\n--bn\r\n" + bytes(range(100))
+
+
+def body(*ranges, content_range=None):
+    out = b""
+    for start, end in ranges:
+        out += b"--bnd\r\nContent-Type: application/octet-stream\r\n"
+        out += b"Content-Range: %s\r\n\r\n" % (
+            content_range or b"bytes %d-%d/%d" % (start, end - 1, len(RESOURCE))
+        )
+        out += RESOURCE[start:end] + b"\r\n"
+    return out + b"--bnd--\r\n"
+
+
+def parse(data, size, sink=None, **kwargs):
+    parser = ByteRangesParser("bnd", **kwargs)
+    ranges = []
+    for chunk in chunked(data, size):
+        parser.recv(chunk)
+        for event in parser:
+            if isinstance(event, RangePart):
+                ranges.append((event.start, event.end, event.total))
+            elif isinstance(event, RangeData):
+                if sink is not None:
+                    sink.write(event)
+    assert parser.next_event() is Events.FINISHED
+    return ranges
+
+
+@pytest.mark.parametrize("size", [1, 7, 10000])
+@pytest.mark.parametrize("zero_copy", [False, True])
+def test_reassemble_out_of_order(tmp_path, size, zero_copy):
+    path = tmp_path / "resource.bin"
+    first = body((200, len(RESOURCE)), (0, 50))
+    second = body((100, 200), (50, 100))
+
+    with RangeFileSink(str(path), len(RESOURCE)) as sink:
+        ranges = parse(first, size, sink, zero_copy=zero_copy)
+        ranges += parse(second, size, sink, zero_copy=zero_copy)
+
+    assert ranges == [
+        (200, len(RESOURCE) - 1, len(RESOURCE)),
+        (0, 49, len(RESOURCE)),
+        (100, 199, len(RESOURCE)),
+        (50, 99, len(RESOURCE)),
+    ]
+    assert path.read_bytes() == RESOURCE
+
+
+@pytest.mark.parametrize("size", [1, 7, 10000])
+def test_short_range_body(size):
+    data = body((0, 50)).replace(RESOURCE[:50], RESOURCE[:49])
+    with pytest.raises(MalformedData):
+        parse(data, size)
+
+
+@pytest.mark.parametrize("size", [1, 7, 10000])
+def test_long_range_body(size):
+    data = body((0, 50)).replace(RESOURCE[:50], RESOURCE[:51])
+    with pytest.raises(MalformedData):
+        parse(data, size)
+
+
+def test_missing_content_range():
+    data = b"--bnd\r\nContent-Type: text/plain\r\n\r\nx\r\n--bnd--\r\n"
+    with pytest.raises(MalformedData):
+        parse(data, 10000)
+
+
+@pytest.mark.parametrize(
+    "content_range",
+    [b"bytes 5-4/10", b"bytes 0-10/10", b"items 0-4/10", b"bytes 0-/10", b"bytes */10"],
+)
+def test_invalid_content_range(content_range):
+    with pytest.raises(MalformedData):
+        parse(body((0, 5), content_range=content_range), 10000)
+
+
+def test_parse_content_range():
+    assert parse_content_range("bytes 0-499/1234") == (0, 499, 1234)
+    assert parse_content_range(" BYTES 5-5/* ") == (5, 5, None)
+
+
+def test_range_file_sink_bounds(tmp_path):
+    with RangeFileSink(str(tmp_path / "out.bin"), 10) as sink:
+        sink.pwrite(b"x" * 10, 0)
+        with pytest.raises(LimitExceeded):
+            sink.pwrite(b"x", 10)
+        with pytest.raises(LimitExceeded):
+            sink.pwrite(b"x", -1)
@@ -0,0 +1,95 @@
+from sansio_multipart import MultipartCallbackParser, Events
+
+
+DATA = (
+    b"--bnd\r\n"
+    b"Content-Disposition: form-data; name=a\r\n"
+    b"Content-Type: text/plain\r\n"
+    b"\r\n"
+    b"first\r\n--bn\r\n"
+    b"--bnd\r\n"
+    b"Content-Disposition: form-data; name=b\r\n"
+    b"\r\n"
+    b"\r\n"
+    b"--bnd--\r\n"
+)
+
+HEADERS_A = [
+    ("Content-Disposition", "form-data; name=a"),
+    ("Content-Type", "text/plain"),
+]
+
+EXPECTED = [
+    ("begin", HEADERS_A),
+    ("data", b"first\r\n--bn"),
+    ("end",),
+    ("begin", [("Content-Disposition", "form-data; name=b")]),
+    ("end",),
+    ("finish",),
+]
+
+
+class Recorder:
+    def __init__(self):
+        self.calls = []
+
+    def handlers(self):
+        return dict(
+            on_part_begin=lambda headerlist: self.calls.append(("begin", headerlist)),
+            on_data=self.on_data,
+            on_part_end=lambda: self.calls.append(("end",)),
+            on_finish=lambda: self.calls.append(("finish",)),
+        )
+
+    def on_data(self, view):
+        assert view.readonly
+        # Join up data that arrived in pieces, to compare across chunkings.
+        if self.calls and self.calls[-1][0] == "data":
+            self.calls[-1] = ("data", self.calls[-1][1] + bytes(view))
+        else:
+            self.calls.append(("data", bytes(view)))
+
+
+def run(parser, chunks):
+    for chunk in chunks:
+        parser.recv(chunk)
+        # Nothing is queued, not even NEED_DATA.
+        assert not parser.events_queue
+
+
+def test_handler_order_across_splits():
+    for i in range(len(DATA) + 1):
+        recorder = Recorder()
+        parser = MultipartCallbackParser("bnd", **recorder.handlers())
+        run(parser, [DATA[:i], DATA[i:]])
+        assert recorder.calls == EXPECTED
+        assert parser.next_event() is Events.FINISHED
+
+
+def test_one_byte_chunks():
+    recorder = Recorder()
+    parser = MultipartCallbackParser("bnd", **recorder.handlers())
+    run(parser, [DATA[i : i + 1] for i in range(len(DATA))])
+    assert recorder.calls == EXPECTED
+
+
+def test_finish_is_called_once():
+    recorder = Recorder()
+    parser = MultipartCallbackParser("bnd", **recorder.handlers())
+    run(parser, [DATA, b"epilogue", b"more"])
+    assert recorder.calls.count(("finish",)) == 1
+
+
+def test_reset():
+    recorder = Recorder()
+    parser = MultipartCallbackParser("bnd", **recorder.handlers())
+    run(parser, [DATA])
+    parser.reset("other")
+    run(parser, [DATA.replace(b"--bnd", b"--other")])
+    assert recorder.calls == EXPECTED * 2
+
+
+def test_handlers_may_be_left_out():
+    parser = MultipartCallbackParser("bnd")
+    run(parser, [DATA])
+    assert parser.next_event() is Events.FINISHED
@@ -0,0 +1,81 @@
+import base64
+import quopri
+
+import pytest
+
+from sansio_multipart.decoders import Base64Decoder, QuotedPrintableDecoder, get_decoder
+from sansio_multipart.errors import MalformedData
+
+from conftest import body, chunked, collect, part
+
+
+DATA = bytes(range(256)) * 3 + ("caf\xe9 = x\t\n" * 20).encode("latin1") + b"end ="
+
+CHUNK_SIZES = [1, 2, 3, 5]
+
+
+def decode(decoder, encoded, size):
+    out = b""
+    for chunk in chunked(encoded, size):
+        out += decoder.decode([chunk])
+    return out + decoder.flush()
+
+
+@pytest.mark.parametrize("size", CHUNK_SIZES)
+def test_base64(size):
+    encoded = base64.encodebytes(DATA)
+    assert decode(Base64Decoder(), encoded, size) == DATA
+    assert decode(Base64Decoder(), encoded.replace(b"\n", b"\r\n"), size) == DATA
+
+
+@pytest.mark.parametrize("size", CHUNK_SIZES)
+@pytest.mark.parametrize("newline", [b"\n", b"\r\n"])
+def test_quoted_printable(size, newline):
+    encoded = quopri.encodestring(DATA).replace(b"\n", newline)
+    expected = DATA.replace(b"\n", newline)
+    # Soft line breaks must be carried over chunks.
+    assert b"=" + newline in encoded
+    assert decode(QuotedPrintableDecoder(), encoded, size) == expected
+
+
+def test_incomplete_base64_quantum():
+    decoder = Base64Decoder()
+    decoder.decode([b"YWJj", b"ZA"])
+    with pytest.raises(MalformedData):
+        decoder.flush()
+
+
+def test_get_decoder():
+    assert get_decoder(" 7BIT ") is None
+    assert get_decoder("binary") is None
+    assert isinstance(get_decoder("Base64"), Base64Decoder)
+    assert isinstance(get_decoder("quoted-printable"), QuotedPrintableDecoder)
+    with pytest.raises(MalformedData):
+        get_decoder("x-unknown")
+
+
+def encoded_body(encoding, encoded):
+    return body(part(b"a", encoded, b"Content-Transfer-Encoding: %s\r\n" % encoding))
+
+
+def parse(data, size):
+    """ The decoded body of the one part in data. """
+    ((_, out),) = collect(chunked(data, size), decode_transfer_encoding=True)
+    return out
+
+
+@pytest.mark.parametrize("size", CHUNK_SIZES)
+def test_parser_decodes_parts(size):
+    encoded = base64.encodebytes(DATA).replace(b"\n", b"\r\n").rstrip()
+    assert parse(encoded_body(b"base64", encoded), size) == DATA
+
+    encoded = quopri.encodestring(DATA).replace(b"\n", b"\r\n")
+    expected = DATA.replace(b"\n", b"\r\n")
+    assert parse(encoded_body(b"quoted-printable", encoded), size) == expected
+
+
+@pytest.mark.parametrize("size", CHUNK_SIZES + [1000])
+def test_parser_incomplete_base64_quantum(size):
+    data = encoded_body(b"base64", b"YWJjZA")
+    with pytest.raises(MalformedData):
+        parse(data, size)
@@ -0,0 +1,152 @@
+import gzip
+import os
+from io import BytesIO
+
+import pytest
+
+from sansio_multipart import (
+    MultipartEncoder,
+    MultipartParser,
+    FileSegment,
+    Part,
+    PartData,
+    Events,
+)
+
+from conftest import chunked
+
+
+def decode(encoder, chunk_size=7):
+    """ Parse an encoded body back, returning its buffered parts. """
+    data = b"".join(encoder)
+    parser = MultipartParser(encoder.boundary, content_length=len(data))
+    parts = []
+    for chunk in chunked(data, chunk_size):
+        parser.recv(chunk)
+        for event in parser:
+            if isinstance(event, Part):
+                parts.append(event)
+            elif isinstance(event, PartData):
+                parts[-1].buffer(event)
+    assert parser.next_event() is Events.FINISHED
+    return parts
+
+
+def test_round_trip(tmp_path):
+    path = tmp_path / "upload.bin"
+    path.write_bytes(b"\x00file\r\n--data\r\n" * 1000)
+
+    with open(path, "rb") as f:
+        f.seek(5)
+        encoder = MultipartEncoder(
+            fields=[("text", "caf\xe9"), ("raw", b"\r\n--\r\n"), ("empty", "")],
+            files=[
+                ("disk", "upload.bin", f),
+                ("memory", 'quote".txt', BytesIO(b"in memory"), "text/plain"),
+            ],
+            block_size=100,
+        )
+        assert any(isinstance(segment, FileSegment) for segment in encoder.segments())
+        assert len(b"".join(encoder)) == encoder.content_length
+        parts = decode(encoder)
+        # The file's position is left alone.
+        assert f.tell() == 5
+
+    assert [part.name for part in parts] == ["text", "raw", "empty", "disk", "memory"]
+    assert parts[0].raw == "caf\xe9".encode("utf8")
+    assert parts[1].raw == b"\r\n--\r\n"
+    assert parts[2].raw == b""
+    assert parts[3].raw == path.read_bytes()[5:]
+    assert parts[3].filename == "upload.bin"
+    assert parts[3].content_type == "application/octet-stream"
+    assert parts[4].raw == b"in memory"
+    assert parts[4].filename == 'quote".txt'
+    assert parts[4].content_type == "text/plain"
+
+
+def test_mapping_arguments():
+    encoder = MultipartEncoder(
+        fields={"a": "1"}, files={"b": ("b.txt", BytesIO(b"2"))}, boundary="bnd"
+    )
+    assert encoder.content_type == "multipart/form-data; boundary=bnd"
+    assert len(b"".join(encoder)) == encoder.content_length
+    assert [(part.name, part.raw) for part in decode(encoder)] == [
+        ("a", b"1"),
+        ("b", b"2"),
+    ]
+
+
+@pytest.mark.parametrize(
+    "fields, files",
+    [
+        ([("a\r\nX-Injected: 1", "x")], []),
+        ([], [("a", "a.txt\r\nX-Injected: 1", BytesIO(b"x"))]),
+        ([], [("a", "a.txt", BytesIO(b"x"), "text/plain\r\nX-Injected: 1")]),
+        ([], [("a", "a.txt", BytesIO(b"x"), "text/plain\0")]),
+    ],
+)
+def test_header_injection(fields, files):
+    with pytest.raises(ValueError):
+        MultipartEncoder(fields=fields, files=files)
+
+
+def test_boundary_injection():
+    with pytest.raises(ValueError):
+        MultipartEncoder(boundary="bnd\r\n")
+
+
+class CountingIO(BytesIO):
+    def __init__(self, data):
+        super().__init__(data)
+        self.reads = []
+
+    def read(self, size=-1):
+        self.reads.append(size)
+        return super().read(size)
+
+
+def test_streams_are_read_lazily():
+    stream = CountingIO(b"x" * 1000)
+    stream.seek(10)
+    encoder = MultipartEncoder(files=[("a", "a.bin", stream)], block_size=64)
+    assert stream.reads == []
+    assert stream.tell() == 10
+    assert not any(isinstance(s, FileSegment) for s in encoder.segments())
+
+    data = b"".join(encoder)
+    assert len(data) == encoder.content_length
+    assert all(0 < size <= 64 for size in stream.reads)
+    # Streams that can seek are sent from the same position each time.
+    assert b"".join(encoder) == data
+    assert [part.raw for part in decode(encoder)] == [b"x" * 990]
+
+
+def test_gzip_file_sends_its_content(tmp_path):
+    path = tmp_path / "data.gz"
+    with gzip.open(path, "wb") as f:
+        f.write(b"uncompressed " * 500)
+
+    with gzip.open(path, "rb") as f:
+        encoder = MultipartEncoder(files=[("a", "data", f)], block_size=100)
+        assert not any(isinstance(s, FileSegment) for s in encoder.segments())
+        assert len(b"".join(encoder)) == encoder.content_length
+        assert [part.raw for part in decode(encoder)] == [b"uncompressed " * 500]
+
+
+def test_pipe_has_no_content_length():
+    read_fd, write_fd = os.pipe()
+    os.write(write_fd, b"piped data")
+    os.close(write_fd)
+
+    with open(read_fd, "rb") as f:
+        encoder = MultipartEncoder(fields=[("b", "1")], files=[("a", "p", f)])
+        assert encoder.content_length is None
+        assert [part.raw for part in decode(encoder)] == [b"1", b"piped data"]
+
+
+def test_stream_shorter_than_when_added():
+    stream = BytesIO(b"x" * 100)
+    encoder = MultipartEncoder(files=[("a", "a.bin", stream)])
+    stream.truncate(50)
+    with pytest.raises(ValueError):
+        b"".join(encoder)
@@ -0,0 +1,74 @@
+from sansio_multipart import MultipartParser, Part
+from sansio_multipart.headers import PartHeaders
+from sansio_multipart.utils import (
+    parse_options_header,
+    _parse_options_cached,
+    _cached_header_size,
+)
+
+
+def test_lookups_are_case_insensitive():
+    headers = PartHeaders([("Content-Type", "text/plain"), ("X-A", "1")])
+    headers.add("x-a", "2")
+    headers.add("X-B", "3")
+
+    for name in ("X-A", "x-a", "X-a"):
+        # The first value wins, as with wsgiref.headers.Headers.
+        assert headers.get(name) == "1"
+        assert headers[name] == "1"
+        assert name in headers
+        assert headers.get_all(name) == ["1", "2"]
+    assert headers.get("content-type") == "text/plain"
+    assert headers.get("missing") is None
+    assert headers.get("missing", "default") == "default"
+    assert headers["missing"] is None
+    assert headers.get_all("missing") == []
+
+    # Adding after the first lookup keeps the dict up to date.
+    assert headers["x-b"] == "3"
+    assert len(headers) == 4
+    assert headers.keys() == ["Content-Type", "X-A", "x-a", "X-B"]
+    assert headers.items() == headers.headerlist
+
+
+def test_parsed_part_headers():
+    parser = MultipartParser("bnd")
+    parser.recv(
+        b"--bnd\r\n"
+        b"content-disposition: form-data; name=a\r\n"
+        b"X-Repeated: first\r\n"
+        b"x-repeated: second\r\n"
+        b"\r\n"
+        b"data\r\n--bnd--\r\n"
+    )
+    part = next(event for event in parser if isinstance(event, Part))
+    assert part.name == "a"
+    assert part.headers["X-REPEATED"] == "first"
+    assert part.headers.get_all("X-Repeated") == ["first", "second"]
+
+
+def test_options_header():
+    header = 'form-data; name="a"; filename="C:\\\\dir\\\\f.txt"'
+    assert parse_options_header(header) == (
+        "form-data",
+        {"name": "a", "filename": "f.txt"},
+    )
+    assert parse_options_header("Text/Plain") == ("text/plain", {})
+    # Each call gets its own options, even when the parse was cached.
+    parse_options_header("text/plain; charset=utf8")[1]["charset"] = "changed"
+    assert parse_options_header("text/plain; charset=utf8")[1] == {"charset": "utf8"}
+
+
+def test_long_headers_skip_the_cache():
+    _parse_options_cached.cache_clear()
+    short = "form-data; name=a"
+    parse_options_header(short)
+    parse_options_header(short)
+    info = _parse_options_cached.cache_info()
+    assert (info.hits, info.misses, info.currsize) == (1, 1, 1)
+
+    long = "form-data; name=a; filename=%s" % ("x" * _cached_header_size)
+    assert parse_options_header(long)[1]["filename"] == "x" * _cached_header_size
+    parse_options_header(long)
+    info = _parse_options_cached.cache_info()
+    assert (info.hits, info.misses, info.currsize) == (1, 1, 1)
@@ -0,0 +1,83 @@
+import mmap
+from io import BytesIO
+
+import pytest
+
+from sansio_multipart import index_parts
+from sansio_multipart.errors import UnexpectedExit
+
+from conftest import BOUNDARY, collect
+
+
+DATA = (
+    b"\r\n"
+    b"--bnd\r\n"
+    b"Content-Disposition: form-data; name=a\r\n"
+    b"\r\n"
+    b"first\r\n"
+    b"--bnd\r\n"
+    b'Content-Disposition: form-data; name=b; filename="b.txt"\r\n'
+    b"Content-Type: text/plain\r\n"
+    b"\r\n"
+    b"\r\nline\r\n--bn\r\n--bnd-\r\n"
+    b"--bnd\r\n"
+    b"Content-Disposition: form-data; name=c\r\n"
+    b"\r\n"
+    b"\r\n"
+    b"--bnd\n"
+    b"Content-Disposition: form-data; name=d\n"
+    b"\n"
+    b"\n"
+    b"\n"
+    b"--bnd--\r\n"
+)
+
+
+def check(index, data):
+    assert [(part.name, bytes(part.body(data))) for part in index] == collect([data])
+    for part in index:
+        assert data[part.header_start :].startswith(b"--bnd")
+        assert data[part.header_start - 1 : part.header_start] in (b"", b"\n")
+
+
+def test_index_every_block_size():
+    expected = collect([DATA])
+    assert [name for name, _ in expected] == ["a", "b", "c", "d"]
+    for block_size in range(1, len(DATA) + 1):
+        index = index_parts(DATA, BOUNDARY, block_size=block_size)
+        check(index, DATA)
+
+
+def test_index_file():
+    for block_size in (1, 7, 2 ** 20):
+        index = index_parts(BytesIO(DATA), BOUNDARY, block_size=block_size)
+        check(index, DATA)
+    assert index[1].filename == "b.txt"
+    assert index[0].filename is None
+
+
+def test_index_incomplete_body():
+    with pytest.raises(UnexpectedExit):
+        index_parts(DATA[: -len(b"--bnd--\r\n")], BOUNDARY)
+
+
+def test_index_in_place_sources():
+    with mmap.mmap(-1, len(DATA)) as body:
+        body[:] = DATA
+        check(index_parts(body, BOUNDARY, block_size=5), DATA)
+        check(index_parts(memoryview(body), BOUNDARY, block_size=5), DATA)
+    # Only part of the buffer, so it is copied a block at a time instead.
+    padded = bytearray(DATA + b"garbage")
+    check(index_parts(memoryview(padded)[: len(DATA)], BOUNDARY, block_size=5), DATA)
+
+
+def test_index_mmap_in_place():
+    with mmap.mmap(-1, len(DATA)) as body:
+        body[:] = DATA
+        first = index_parts(body, BOUNDARY, block_size=5)
+        # Indexing neither depends on nor moves the mmap's position.
+        assert index_parts(body, BOUNDARY) == first
+        body.seek(3)
+        assert index_parts(body, BOUNDARY, block_size=7) == first
+        assert body.tell() == 3
+        check(first, DATA)
@@ -0,0 +1,85 @@
+import pytest
+
+from sansio_multipart import MultipartParser, Events
+from sansio_multipart.errors import (
+    MalformedData,
+    TooManyParts,
+    HeaderTooLarge,
+    TooManyHeaders,
+    PartTooLarge,
+    BodyTooLarge,
+)
+
+from conftest import BOUNDARY, body, chunked, part
+
+
+def chunkings(data):
+    """ The body in one chunk, split in two everywhere, and in 1 byte chunks. """
+    yield [data]
+    for i in range(1, len(data)):
+        yield [data[:i], data[i:]]
+    yield chunked(data, 1)
+
+
+def parse(chunks, **limits):
+    parser = MultipartParser(BOUNDARY, **limits)
+    for chunk in chunks:
+        parser.recv(chunk)
+        parser.parts()
+    assert parser.next_event() is Events.FINISHED
+
+
+def check_limit(data, error, name, at_limit):
+    """
+    Parsing data succeeds with the limit set to at_limit, and raises error
+    with it one lower, however data is chunked.
+    """
+    for chunks in chunkings(data):
+        parse(chunks, **{name: at_limit})
+        with pytest.raises(error):
+            parse(chunks, **{name: at_limit - 1})
+
+
+def test_max_parts():
+    data = body((b"a", b"1"), (b"b", b"2"), (b"c", b"3"))
+    check_limit(data, TooManyParts, "max_parts", 3)
+
+
+@pytest.mark.parametrize("index", [0, 1, 2])
+def test_max_header_bytes(index):
+    # The longest header segment may be any one of the parts.
+    parts = [(b"a", b"first"), (b"b", b"second\r\n"), (b"c", b"")]
+    _, data = parts[index]
+    padding = b"X-Padding: %s\r\n" % (b"p" * 40)
+    parts[index] = part(b"x", data, padding)
+    size = len(part(b"x", b"", padding)) - len(b"\r\n")
+    check_limit(body(*parts), HeaderTooLarge, "max_header_bytes", size)
+
+
+def test_max_header_bytes_bare_lf():
+    head = b"--bnd\nContent-Disposition: form-data; name=a\n\n"
+    data = head + b"value\n--bnd--\n"
+    check_limit(data, HeaderTooLarge, "max_header_bytes", len(head))
+
+
+def test_max_headers_per_part():
+    extra = b"".join(b"X-%d: x\r\n" % i for i in range(4))
+    data = body((b"a", b"1"), part(b"b", b"2", extra))
+    check_limit(data, TooManyHeaders, "max_headers_per_part", 5)
+
+
+def test_max_part_size():
+    data = body((b"a", b"x" * 20), (b"b", b"\r\n" * 15), (b"c", b""))
+    check_limit(data, PartTooLarge, "max_part_size", 30)
+
+
+def test_max_total_size():
+    data = body((b"a", b"1"), (b"b", b"2"))
+    check_limit(data, BodyTooLarge, "max_total_size", len(data))
+
+
+def test_part_content_length_is_enforced():
+    data = body(part(b"a", b"12345", b"Content-Length: 4\r\n"))
+    for chunks in chunkings(data):
+        with pytest.raises(MalformedData):
+            parse(chunks)
@@ -0,0 +1,259 @@
+import pytest
+
+from sansio_multipart import MultipartParser, Part, PartData, Events, parse_part_headers
+from sansio_multipart.errors import MalformedData, UnexpectedExit, TooManyParts
+from sansio_multipart.utils import to_bytes
+
+from conftest import BOUNDARY, body, chunked, collect, splits
+
+
+def expected(*parts):
+    return [(name.decode(), data) for name, data in parts]
+
+
+PARTS = [
+    (b"a", b"first value"),
+    (b"b", b"line one\r\nline two\r\n"),
+    (b"c", b""),
+]
+
+NEAR_MISSES = [
+    b"\r\n--bndx",
+    b"\r\n--bn",
+    b"\r\n--bnd-x",
+    b"\r\n--bnd--x",
+    b"\r\n--",
+    b"\r\r\n\n--bnd ",
+    b"x--bnd\r\n",
+    b"\r\n-",
+    b"\r",
+]
+
+
+@pytest.mark.parametrize("zero_copy", [False, True])
+def test_every_two_chunk_split(zero_copy):
+    data = body(*PARTS)
+    for chunks in splits(data):
+        assert collect(chunks, zero_copy=zero_copy) == expected(*PARTS)
+
+
+@pytest.mark.parametrize("zero_copy", [False, True])
+def test_one_byte_chunks(zero_copy):
+    data = body(*PARTS)
+    chunks = chunked(data, 1)
+    assert collect(chunks, zero_copy=zero_copy) == expected(*PARTS)
+
+
+def test_split_crlf_in_headers():
+    data = body((b"a", b"\nvalue"))
+    header_end = data.index(b"\r\n\r\n")
+    for i in (header_end + 1, header_end + 3):
+        assert data[i - 1 : i] == b"\r"
+        assert collect([data[:i], data[i:]]) == expected((b"a", b"\nvalue"))
+
+
+def test_delimiter_split_across_chunks():
+    parts = [(b"a", b"x" * 100), (b"b", b"y")]
+    data = body(*parts)
+    delimiter = data.index(b"\r\n--bnd\r\n")
+    for i in range(delimiter, delimiter + len(b"\r\n--bnd\r\n") + 1):
+        assert collect([data[:i], data[i:]]) == expected(*parts)
+
+
+@pytest.mark.parametrize("miss", NEAR_MISSES)
+def test_near_miss_is_body_data(miss):
+    parts = [(b"a", miss), (b"b", b"pre" + miss + b"post"), (b"c", miss + miss)]
+    data = body(*parts)
+    assert collect([data]) == expected(*parts)
+    for chunks in splits(data):
+        assert collect(chunks, content_length=len(data)) == expected(*parts)
+
+
+def test_terminator_at_chunk_end_waits_for_content_length():
+    data = body((b"a", b"\r\n--bnd--x"))
+    i = data.index(b"--bnd--x") + len(b"--bnd--")
+    assert collect([data[:i], data[i:]], content_length=len(data)) == expected(
+        (b"a", b"\r\n--bnd--x")
+    )
+
+
+def test_terminator_without_trailing_crlf():
+    data = body(*PARTS, terminator=b"--bnd--")
+    assert collect([data]) == expected(*PARTS)
+    for chunks in splits(data):
+        assert collect(chunks) == expected(*PARTS)
+        assert collect(chunks, content_length=len(data)) == expected(*PARTS)
+
+
+def test_bare_lf_newlines():
+    data = body(*PARTS, newline=b"\n", terminator=b"--bnd--\n")
+    for chunks in splits(data):
+        assert collect(chunks) == expected(*PARTS)
+
+
+def test_epilogue_is_ignored():
+    data = body(*PARTS) + b"epilogue --bnd\r\n"
+    assert collect([data]) == expected(*PARTS)
+
+
+def test_missing_boundary():
+    with pytest.raises(MalformedData):
+        collect([b"--other\r\n"])
+
+
+def test_missing_disposition():
+    with pytest.raises(MalformedData):
+        collect([b"--bnd\r\nContent-Type: text/plain\r\n\r\nx\r\n--bnd--\r\n"])
+
+
+def test_parse_part_headers():
+    data = body(*PARTS)
+    for source in (data, chunked(data, 3)):
+        parts = parse_part_headers(source, BOUNDARY)
+        assert [part.name for part in parts] == ["a", "b", "c"]
+
+
+def test_parse_part_headers_raises_limit_errors():
+    with pytest.raises(TooManyParts):
+        parse_part_headers(body(*PARTS), BOUNDARY, max_parts=2)
+
+
+def test_parse_part_headers_raises_malformed_data():
+    data = b"--bnd\r\nContent-Type: text/plain\r\n\r\nx\r\n--bnd--\r\n"
+    with pytest.raises(MalformedData):
+        parse_part_headers(data, BOUNDARY)
+
+
+def test_parse_part_headers_unexpected_end():
+    data = body(*PARTS)
+    with pytest.raises(UnexpectedExit):
+        parse_part_headers(data[: -len(b"--bnd--\r\n")], BOUNDARY)
+
+
+@pytest.mark.parametrize(
+    "boundary", ["bnd", b"bnd", bytearray(b"bnd"), memoryview(b"bnd")]
+)
+def test_boundary_types(boundary):
+    parser = MultipartParser(boundary)
+    parser.recv(body(*PARTS))
+    names = [event.name for event in parser if isinstance(event, Part)]
+    assert names == ["a", "b", "c"]
+    assert parser.next_event() is Events.FINISHED
+
+
+def test_reset_with_another_boundary():
+    parser = MultipartParser(BOUNDARY)
+    for boundary in ("bnd", "other", b"bnd"):
+        parser.reset(boundary)
+        data = body(*PARTS, boundary=to_bytes(boundary))
+        parser.recv(data[:10])
+        parser.recv(data[10:])
+        parts = [event.name for event in parser if isinstance(event, Part)]
+        assert parts == ["a", "b", "c"]
+        assert parser.next_event() is Events.FINISHED
+
+
+def events(parser):
+    """ Take the events queued, one at a time, as (kind, value) pairs. """
+    out = []
+    for event in parser:
+        if isinstance(event, Part):
+            out.append(("part", event.name))
+        elif isinstance(event, PartData):
+            out.append(("data", bytes(event.raw)))
+    return out
+
+
+def test_skip_part_drops_queued_data():
+    data = body((b"a", b"x" * 100), (b"b", b"y"))
+    start = data.index(b"x" * 100)
+    for i in range(start + 1, start + 100):
+        parser = MultipartParser(BOUNDARY)
+        parser.recv(data[:i])
+        assert parser.next_event().name == "a"
+        parser.skip_part()
+        assert events(parser) == []
+        parser.recv(data[i:])
+        assert events(parser) == [("part", "b"), ("data", b"y")]
+        assert parser.next_event() is Events.FINISHED
+
+
+def test_skip_part_after_part_end_is_a_no_op():
+    parser = MultipartParser(BOUNDARY)
+    parser.recv(body((b"a", b"x"), (b"b", b"y"), (b"c", b"z")))
+    assert parser.next_event().name == "a"
+    assert bytes(parser.next_event().raw) == b"x"
+    # The next Part is already queued.
+    parser.skip_part()
+    assert events(parser) == [
+        ("part", "b"),
+        ("data", b"y"),
+        ("part", "c"),
+        ("data", b"z"),
+    ]
+
+
+def test_skip_part_of_finished_body_is_a_no_op():
+    parser = MultipartParser(BOUNDARY)
+    parser.recv(body((b"a", b"x")))
+    assert parser.next_event().name == "a"
+    parser.skip_part()
+    assert events(parser) == []
+    assert parser.next_event() is Events.FINISHED
+
+
+def test_skip_half_received_base64_part():
+    data = (
+        b"--bnd\r\n"
+        b"Content-Disposition: form-data; name=a\r\n"
+        b"Content-Transfer-Encoding: base64\r\n"
+        b"\r\n"
+        b"YWJjZGVm\r\n"
+        b"--bnd\r\n"
+        b"Content-Disposition: form-data; name=b\r\n"
+        b"\r\n"
+        b"y\r\n"
+        b"--bnd--\r\n"
+    )
+    start = data.index(b"YWJjZGVm")
+    for i in range(start, start + 8):
+        parser = MultipartParser(BOUNDARY, decode_transfer_encoding=True)
+        parser.recv(data[:i])
+        assert parser.next_event().name == "a"
+        parser.skip_part()
+        for chunk in chunked(data[i:], 3):
+            parser.recv(chunk)
+        assert events(parser) == [("part", "b"), ("data", b"y")]
+
+
+def zero_copy_data(chunk):
+    parser = MultipartParser(BOUNDARY, zero_copy=True)
+    parser.recv(chunk)
+    return [event for event in parser if isinstance(event, PartData)]
+
+
+@pytest.mark.parametrize("make", [bytes, bytearray])
+def test_zero_copy_views_the_chunk(make):
+    chunk = make(body((b"a", b"x" * 100)))
+    for data in (zero_copy_data(chunk), zero_copy_data(memoryview(chunk))):
+        assert [bytes(event.raw) for event in data] == [b"x" * 100]
+        assert data[0].raw.obj is chunk
+        assert data[0].raw.readonly
+
+
+def test_zero_copy_part_of_a_buffer_is_copied():
+    buffer = bytearray(body((b"a", b"x" * 100)) + b"garbage")
+    data = zero_copy_data(memoryview(buffer)[: -len(b"garbage")])
+    assert [bytes(event.raw) for event in data] == [b"x" * 100]
+    assert data[0].raw.obj is not buffer
+
+
+def test_zero_copy_commit_views_the_recv_buffer():
+    parser = MultipartParser(BOUNDARY, zero_copy=True)
+    data = body((b"a", b"x" * 100))
+    buffer = parser.get_buffer(len(data) + 10)
+    buffer[: len(data)] = data
+    parser.commit(len(data))
+    (event,) = [event for event in parser if isinstance(event, PartData)]
+    assert bytes(event.raw) == b"x" * 100
+    assert event.raw.obj is parser.recv_buffer
@@ -0,0 +1,138 @@
+import hashlib
+import threading
+import zlib
+
+import pytest
+
+from sansio_multipart import MultipartParser, Part, PartData, PartPipeline, SpooledSink
+
+from conftest import BOUNDARY, body, chunked
+
+
+def run(pipeline, parser, chunks):
+    """ Feed chunks to parser, and its events to pipeline. """
+    for chunk in chunks:
+        parser.recv(chunk)
+        for event in parser:
+            if isinstance(event, Part):
+                pipeline.begin(event)
+            elif isinstance(event, PartData):
+                pipeline.feed(event)
+    return pipeline.finish()
+
+
+def run_in_thread(target):
+    """ Run target, failing the test if it does not return in time. """
+    errors = []
+
+    def wrapper():
+        try:
+            target()
+        except BaseException as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=wrapper, daemon=True)
+    thread.start()
+    thread.join(10)
+    assert not thread.is_alive(), "pipeline blocked"
+    return errors
+
+
+class FailingSink(SpooledSink):
+    def write(self, data):
+        if self.size > 100:
+            raise OSError("disk full")
+        super().write(data)
+
+
+class GatedSink(SpooledSink):
+    """ Holds up the workers until the gate is opened. """
+
+    gate = None
+
+    def write(self, data):
+        self.gate.wait()
+        super().write(data)
+
+
+def test_digests_and_sizes():
+    parts = [(b"p%d" % i, bytes(range(i % 256)) * (i + 1)) for i in range(50)]
+    data = body(*parts)
+    chunks = chunked(data, 97)
+
+    with PartPipeline(
+        ("sha256", "md5"), crc32=True, workers=1, max_queued=1
+    ) as pipeline:
+        done = run(pipeline, MultipartParser(BOUNDARY), chunks)
+
+    assert [part.name for part in done] == [name.decode() for name, _ in parts]
+    for part, (_, expected) in zip(done, parts):
+        assert part.size == len(expected)
+        assert part.raw == expected
+        assert part.digests == {
+            "sha256": hashlib.sha256(expected).hexdigest(),
+            "md5": hashlib.md5(expected).hexdigest(),
+            "crc32": "%08x" % zlib.crc32(expected),
+        }
+
+
+def test_failing_sink_never_blocks_feed():
+    data = body((b"a", b"x" * 5000), (b"b", b"y" * 5000))
+    chunks = chunked(data, 10)
+    parser = MultipartParser(BOUNDARY, sink_factory=FailingSink)
+
+    def target():
+        with PartPipeline(workers=1, max_queued=1) as pipeline:
+            run(pipeline, parser, chunks)
+
+    errors = run_in_thread(target)
+    assert len(errors) == 1
+    assert isinstance(errors[0], OSError)
+
+
+def test_failing_sink_factory_never_blocks_feed():
+    def sink_factory():
+        raise OSError("no space")
+
+    data = body((b"a", b"x" * 5000))
+    chunks = chunked(data, 10)
+    parser = MultipartParser(BOUNDARY, sink_factory=sink_factory)
+
+    def target():
+        with PartPipeline(workers=1, max_queued=1) as pipeline:
+            run(pipeline, parser, chunks)
+
+    errors = run_in_thread(target)
+    assert len(errors) == 1
+    assert isinstance(errors[0], OSError)
+
+
+def test_zero_copy_data_is_copied():
+    expected = bytes(range(256)) * 64
+    data = body((b"a", expected))
+    gate = threading.Event()
+    sink_factory = type("Gated", (GatedSink,), {"gate": gate})
+    parser = MultipartParser(BOUNDARY, zero_copy=True, sink_factory=sink_factory)
+
+    with PartPipeline(workers=1, max_queued=len(data)) as pipeline:
+        # Every chunk is read in to the same buffer, overwriting the last.
+        for chunk in chunked(data, 100):
+            buffer = parser.get_buffer(100)
+            buffer[: len(chunk)] = chunk
+            parser.commit(len(chunk))
+            for event in parser:
+                if isinstance(event, Part):
+                    pipeline.begin(event)
+                elif isinstance(event, PartData):
+                    pipeline.feed(event)
+        gate.set()
+        (part,) = pipeline.finish()
+
+    assert part.raw == expected
+    assert part.digests["sha256"] == hashlib.sha256(expected).hexdigest()
+
+
+def test_feed_before_begin():
+    with PartPipeline() as pipeline:
+        with pytest.raises(RuntimeError):
+            pipeline.feed(PartData(raw=bytearray(b"x"), size=1))
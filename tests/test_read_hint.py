@@ -0,0 +1,135 @@
+from io import BytesIO
+
+import pytest
+
+from sansio_multipart import MultipartParser, Part, PartData, Events, ReadHint
+from sansio_multipart.errors import MalformedData
+
+from conftest import body, part
+
+
+def sized(name, data, length):
+    """ A part with a Content-Length header. """
+    return part(name, data, b"Content-Length: %d\r\n" % length)
+
+
+def drive(stream, content_length=None, block_size=16, **kwargs):
+    """ Read stream as read_hint suggests, returning the parts and hints. """
+    parser = MultipartParser("bnd", content_length, **kwargs)
+    parts, hints = [], []
+    while True:
+        event = parser.next_event()
+        if event is Events.NEED_DATA:
+            hint = parser.read_hint(block_size)
+            hints.append(hint)
+            assert 1 <= hint.minimum <= hint.suggested
+            chunk = stream.read(hint.suggested)
+            assert chunk
+            parser.recv(chunk)
+        elif event is Events.FINISHED:
+            assert parser.read_hint() == ReadHint(0, 0)
+            return [tuple(p) for p in parts], hints
+        elif isinstance(event, Part):
+            parts.append([event.name, b""])
+        elif isinstance(event, PartData):
+            parts[-1][1] += bytes(event.raw)
+
+
+PARTS = [(b"a", b"x" * 100), (b"b", b"\r\n--bn\r\n" * 10), (b"c", b"")]
+
+
+def test_fresh_parser():
+    assert MultipartParser("bnd").read_hint(100) == ReadHint(1, 100)
+    assert MultipartParser("bnd", 10).read_hint(100) == ReadHint(1, 10)
+
+
+def test_minimum_settles_a_held_back_delimiter():
+    data = part(b"a", b"data")
+    for held in (b"\r", b"\r\n", b"\r\n--b", b"\r\n--bnd", b"\r\n--bnd-"):
+        parser = MultipartParser("bnd")
+        parser.recv(data[: -len(b"\r\n")] + held)
+        # CRLF, "--bnd" and CRLF or "--".
+        assert parser.read_hint(2).minimum == 9 - len(held)
+        assert parser.read_hint(2).suggested == max(2, 9 - len(held))
+
+    parser = MultipartParser("bnd")
+    parser.recv(data[: -len(b"\r\n")] + b"\n--b")
+    assert parser.read_hint().minimum == 4
+
+    # The body of a part may start with the separator line.
+    parser = MultipartParser("bnd")
+    parser.recv(b"--bnd\r\nContent-Disposition: form-data; name=a\r\n\r\n--b")
+    assert parser.read_hint().minimum == 4
+
+
+def test_minimum_never_passes_the_content_length():
+    data = body((b"a", b"data"))[: -len(b"\r\n")]
+    parser = MultipartParser("bnd", len(data))
+    parser.recv(data[:-3])
+    assert parser.read_hint() == ReadHint(3, 3)
+
+
+def test_suggested_covers_a_part_with_a_content_length():
+    parser = MultipartParser("bnd")
+    parser.recv(sized(b"a", b"", 1000)[:-2])
+    assert parser.read_hint(16) == ReadHint(1, 1000 + 9)
+    assert parser.read_hint(16, max_size=500) == ReadHint(1, 500)
+    parser.recv(b"x" * 400)
+    assert parser.read_hint(16) == ReadHint(1, 600 + 9)
+
+
+@pytest.mark.parametrize("block_size", [1, 5, 16, 4096])
+@pytest.mark.parametrize("trust_part_length", [False, True])
+def test_driving_by_hints(block_size, trust_part_length):
+    parts = [sized(name, data, len(data)) for name, data in PARTS]
+    parts.append(part(b"d", b"no length"))
+    data = body(*parts)
+    expected = [(name.decode(), data) for name, data in PARTS] + [("d", b"no length")]
+
+    stream = BytesIO(data + b"next")
+    found, hints = drive(
+        stream, len(data), block_size, trust_part_length=trust_part_length
+    )
+    assert found == expected
+    # The parser may finish before the last newline.
+    assert stream.read().endswith(b"next")
+    # Inside parts with a Content-Length, whole parts are asked for.
+    if block_size < 100:
+        assert any(hint.suggested > block_size for hint in hints)
+
+    assert drive(BytesIO(data), None, block_size)[0] == expected
+
+
+def test_trust_part_length_skips_the_delimiter_search():
+    inner = b"\r\n--bnd\r\nnot a part"
+    data = body(sized(b"a", inner, len(inner)), (b"b", b"y"))
+
+    parser = MultipartParser("bnd", trust_part_length=True)
+    parser.recv(data)
+    names = [event.name for event in parser if isinstance(event, Part)]
+    assert names == ["a", "b"]
+
+    # Untrusted, the delimiter inside the part ends it early.
+    parser = MultipartParser("bnd")
+    with pytest.raises(MalformedData):
+        parser.recv(data)
+
+
+@pytest.mark.parametrize("trust_part_length", [False, True])
+def test_understated_part_content_length(trust_part_length):
+    data = body(sized(b"a", b"x" * 100, 99), (b"b", b"y"))
+    for size in (1, 7, len(data)):
+        parser = MultipartParser("bnd", trust_part_length=trust_part_length)
+        with pytest.raises(MalformedData):
+            for i in range(0, len(data), size):
+                parser.recv(data[i : i + size])
+                list(parser)
+
+
+def test_overstated_part_content_length_is_not_an_error():
+    # Only a trusted length that runs past the delimiter swallows it.
+    data = body(sized(b"a", b"x" * 100, 101), (b"b", b"y"))
+    for trust_part_length in (False, True):
+        parser = MultipartParser("bnd", trust_part_length=trust_part_length)
+        parser.recv(data)
+        assert [e.name for e in parser if isinstance(e, Part)] == ["a", "b"]
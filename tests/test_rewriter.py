@@ -0,0 +1,83 @@
+import pytest
+
+from sansio_multipart import MultipartRewriter
+
+from conftest import BOUNDARY, chunked, splits
+
+
+DATA = (
+    b"--bnd\r\n"
+    b"Content-Disposition: form-data; name=a\r\n"
+    b"\r\n"
+    b"first\r\n"
+    b"--bnd\r\n"
+    b'Content-Disposition: form-data; name=secret; filename="s.txt"\r\n'
+    b"Content-Type: text/plain\r\n"
+    b"\r\n"
+    b"line one\r\n--bn\r\nline two\r\n"
+    b"--bnd\r\n"
+    b"Content-Disposition: form-data; name=c\r\n"
+    b"\r\n"
+    b"\r\n"
+    b"--bnd--\r\n"
+)
+
+
+def rewrite(chunks, **kwargs):
+    rewriter = MultipartRewriter(BOUNDARY, **kwargs)
+    return b"".join(rewriter.rewrite(chunk) for chunk in chunks)
+
+
+def test_pass_through():
+    for chunks in splits(DATA):
+        assert rewrite(chunks) == DATA
+    assert rewrite(chunked(DATA, 1)) == DATA
+
+
+def test_drop_part():
+    def on_part(part):
+        return part.name != "secret"
+
+    start = DATA.index(b"--bnd\r\nContent-Disposition: form-data; name=secret")
+    end = DATA.index(b"--bnd\r\nContent-Disposition: form-data; name=c")
+    expected = DATA[:start] + DATA[end:]
+    for chunks in splits(DATA):
+        assert rewrite(chunks, on_part=on_part) == expected
+
+
+def test_replace_headers():
+    def on_part(part):
+        if part.name == "secret":
+            return [("Content-Disposition", "form-data; name=public")]
+
+    start = DATA.index(b"Content-Disposition: form-data; name=secret")
+    end = DATA.index(b"line one")
+    expected = (
+        DATA[:start]
+        + b"Content-Disposition: form-data; name=public\r\n\r\n"
+        + DATA[end:]
+    )
+    for chunks in splits(DATA):
+        assert rewrite(chunks, on_part=on_part) == expected
+
+
+@pytest.mark.parametrize(
+    "headers",
+    [
+        [("Content-Disposition", "form-data; name=a\r\nX-Injected: 1")],
+        [("X-Injected: 1\r\nContent-Disposition", "form-data; name=a")],
+        [("Content-Disposition", "form-data; name=a\n")],
+        [("Content-Disposition", "form-data; name=a\0")],
+    ],
+)
+def test_replacement_header_injection(headers):
+    with pytest.raises(ValueError):
+        rewrite([DATA], on_part=lambda part: headers)
+
+
+def test_reset():
+    rewriter = MultipartRewriter(BOUNDARY)
+    assert rewriter.rewrite(DATA) == DATA
+    other = DATA.replace(b"--bnd", b"--other")
+    rewriter.reset("other")
+    assert rewriter.rewrite(other) == other
@@ -0,0 +1,96 @@
+import pytest
+
+from sansio_multipart import MultipartParser, Part, PartData, SpooledSink
+from sansio_multipart.errors import LimitExceeded
+
+from conftest import body
+
+
+def test_spills_past_mem_limit():
+    sink = SpooledSink(mem_limit=10, disk_limit=100)
+    sink.write(b"x" * 6)
+    sink.write(memoryview(b"y" * 4))
+    # Up to mem_limit bytes stay in memory.
+    assert sink.is_buffered()
+    assert sink.size == 10
+
+    sink.write(b"z")
+    assert not sink.is_buffered()
+    assert sink.size == 11
+    assert sink.getvalue() == b"x" * 6 + b"y" * 4 + b"z"
+    sink.write(b"more")
+    assert sink.getvalue() == b"x" * 6 + b"y" * 4 + b"zmore"
+    sink.close()
+
+
+def test_disk_limit():
+    sink = SpooledSink(mem_limit=10, disk_limit=20)
+    sink.write(b"x" * 15)
+    sink.write(b"x" * 5)
+    with pytest.raises(LimitExceeded):
+        sink.write(b"x")
+    # The write that failed left nothing behind.
+    assert sink.size == 20
+    assert sink.getvalue() == b"x" * 20
+
+    # A single write past both limits fails before spooling anything.
+    sink = SpooledSink(mem_limit=10, disk_limit=20)
+    with pytest.raises(LimitExceeded):
+        sink.write(b"x" * 21)
+    assert sink.is_buffered()
+    assert sink.size == 0
+
+
+def part_of(data, **kwargs):
+    """ The buffered part of a body holding data. """
+    parser = MultipartParser("bnd", **kwargs)
+    parser.recv(body((b"a", data)))
+    part = None
+    for event in parser:
+        if isinstance(event, Part):
+            part = event
+        elif isinstance(event, PartData):
+            part.buffer(event)
+    return part
+
+
+@pytest.mark.parametrize("size, buffered", [(10, True), (11, False)])
+def test_part_storage(size, buffered, tmp_path):
+    data = bytes(range(size))
+    part = part_of(data, mem_limit=10)
+    assert part.is_buffered() is buffered
+    assert part.size == size
+    assert part.raw == data
+
+    file = part.file
+    assert file.read() == data
+    # Each access rewinds it.
+    assert part.file.read(3) == data[:3]
+
+    path = tmp_path / "saved"
+    assert part.save_as(path) == size
+    assert path.read_bytes() == data
+    # Saving leaves the file where it was.
+    assert part.file.tell() == 0
+    file.seek(5)
+    part.save_as(path)
+    assert file.tell() == 5
+    assert part.raw == data
+
+    part.close()
+    assert file.closed
+
+
+def test_part_disk_limit():
+    with pytest.raises(LimitExceeded):
+        part_of(b"x" * 11, mem_limit=5, disk_limit=10)
+
+
+def test_empty_part(tmp_path):
+    part = Part()
+    assert part.is_buffered()
+    assert part.raw == b""
+    assert part.file.read() == b""
+    assert part.save_as(tmp_path / "empty") == 0
+    assert (tmp_path / "empty").read_bytes() == b""
+    part.close()
@@ -0,0 +1,62 @@
+from sansio_multipart import MultipartParser, Events
+
+from conftest import chunked, splits
+
+
+HEADS = [
+    b"--bnd\r\nContent-Disposition: form-data; name=a\r\n"
+    b"Content-Type: text/plain\r\n\r\n",
+    b"--bnd\r\nContent-Disposition: form-data; name=b\r\n\r\n",
+    b"--bnd\nContent-Disposition: form-data; name=c\n\n",
+]
+BODIES = [b"x" * 50 + b"\r\n--bn\r\n", b"", b"\r\n\r\n"]
+END = b"--bnd--\r\nepilogue"
+
+DATA = b"".join(head + body + b"\r\n" for head, body in zip(HEADS, BODIES)) + END
+
+
+def chunkings(data):
+    yield [data]
+    for size in range(1, 12):
+        yield chunked(data, size)
+    yield from splits(data)
+
+
+def stats(chunks):
+    parser = MultipartParser("bnd", stats=True)
+    for chunk in chunks:
+        parser.recv(chunk)
+    parser.parts()
+    assert parser.next_event() is Events.FINISHED
+    return parser.stats
+
+
+def test_counts_do_not_depend_on_chunking():
+    for chunks in chunkings(DATA):
+        s = stats(chunks)
+        assert s.recv_calls == len(chunks)
+        assert s.bytes_received == len(DATA)
+        # Everything up to the terminator line.
+        assert s.bytes_scanned == len(DATA) - len(END)
+        assert s.header_bytes == sum(len(head) for head in HEADS)
+        assert s.body_bytes == sum(len(body) for body in BODIES)
+        assert s.parts == 3
+
+
+def test_transitions():
+    transitions = []
+    parser = MultipartParser(
+        "bnd", on_transition=lambda old, new: transitions.append(new.name)
+    )
+    for chunk in chunked(DATA, 1):
+        parser.recv(chunk)
+    assert transitions == ["BUILDING_BODY", "BUILDING_HEADERS"] * 2 + [
+        "BUILDING_BODY",
+        "FINISHED",
+    ]
+
+
+def test_no_stats_by_default():
+    parser = MultipartParser("bnd")
+    parser.recv(DATA)
+    assert parser.stats is None
@@ -0,0 +1,83 @@
+from urllib.parse import parse_qs
+
+import pytest
+
+from sansio_multipart import URLEncodedParser, Field, Events
+from sansio_multipart.errors import FieldTooLarge, MalformedData, UnexpectedExit
+
+from conftest import chunked
+
+
+DATA = b"a=1&&b&c=%C3%A9+x&name=a+longer+value%21&c=2"
+
+
+def parse(chunks, **kwargs):
+    parser = URLEncodedParser(**kwargs)
+    fields = []
+    for chunk in chunks:
+        parser.recv(chunk)
+        for event in parser:
+            if isinstance(event, Field):
+                fields.append((event.name, event.value))
+    assert parser.next_event() is Events.FINISHED
+    return fields
+
+
+def as_qs(fields):
+    out = {}
+    for name, value in fields:
+        out.setdefault(name, []).append(value)
+    return out
+
+
+def test_matches_parse_qs():
+    expected = parse_qs(DATA.decode(), keep_blank_values=True)
+    assert as_qs(parse([DATA, b""])) == expected
+    assert as_qs(parse([DATA], content_length=len(DATA))) == expected
+    assert parse([b"a=1&&b&c=%C3%A9+x", b""]) == [
+        ("a", "1"),
+        ("b", ""),
+        ("c", "\xe9 x"),
+    ]
+
+
+def test_fields_split_across_chunks():
+    expected = parse([DATA, b""])
+    # b"" ends the body, so neither chunk may be empty.
+    for i in range(1, len(DATA)):
+        assert parse([DATA[:i], DATA[i:], b""]) == expected
+        assert parse([DATA[:i], DATA[i:]], content_length=len(DATA)) == expected
+    assert parse(chunked(DATA, 1) + [b""]) == expected
+
+
+def test_memoryview_chunks():
+    view = memoryview(DATA)
+    assert parse([view[:5], view[5:]], content_length=len(DATA)) == parse([DATA, b""])
+
+
+def test_empty_body():
+    assert parse([], content_length=0) == []
+    assert parse([b""], content_length=0) == []
+    assert parse([b""]) == []
+
+
+def test_end_before_content_length():
+    parser = URLEncodedParser(content_length=10)
+    parser.recv(b"a=1")
+    with pytest.raises(UnexpectedExit):
+        parser.recv(b"")
+
+
+def test_longer_than_content_length():
+    with pytest.raises(MalformedData):
+        parse([b"a=1&b=2"], content_length=5)
+
+
+def test_field_too_large():
+    parse([b"a=12345&b=1", b""], max_field_size=7)
+    with pytest.raises(FieldTooLarge):
+        parse([b"a=12345&b=1", b""], max_field_size=6)
+    with pytest.raises(FieldTooLarge):
+        parse([b"b=1&a=12", b"345", b""], max_field_size=6)
+    with pytest.raises(FieldTooLarge):
+        parse([b"b=1&a=1234567"], max_field_size=6, content_length=13)
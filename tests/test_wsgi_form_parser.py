@@ -0,0 +1,156 @@
+from io import BytesIO
+
+import pytest
+
+from sansio_multipart import parse_form_data, Part
+from sansio_multipart.errors import (
+    MultipartError,
+    MalformedData,
+    UnexpectedExit,
+    LimitExceeded,
+)
+
+from conftest import body, part
+
+
+BODY = body(
+    (b"a", b"first"),
+    (b"b", b"caf\xc3\xa9"),
+    (b'upload; filename="f.txt"', b"file data"),
+)
+
+
+def environ(data, content_type="multipart/form-data; boundary=bnd", length=True):
+    env = {
+        "REQUEST_METHOD": "POST",
+        "CONTENT_TYPE": content_type,
+        "wsgi.input": BytesIO(data),
+    }
+    if length:
+        env["CONTENT_LENGTH"] = str(len(data))
+    return env
+
+
+@pytest.fixture
+def closed(monkeypatch):
+    """ The parts closed during the test. """
+    closed = []
+    close = Part.close
+
+    def record(part):
+        closed.append(part)
+        close(part)
+
+    monkeypatch.setattr(Part, "close", record)
+    return closed
+
+
+@pytest.mark.parametrize("length", [True, False])
+def test_multipart(length):
+    forms, files = parse_form_data(environ(BODY, length=length), block_size=7)
+    assert forms.getall("a") == ["first"]
+    assert forms["b"] == "caf\xe9"
+    assert files["upload"].filename == "f.txt"
+    assert files["upload"].raw == b"file data"
+
+
+def test_content_length_stops_reading():
+    env = environ(BODY)
+    env["wsgi.input"] = BytesIO(BODY + b"next request")
+    forms, files = parse_form_data(env, block_size=7, strict=True)
+    assert env["wsgi.input"].tell() <= len(BODY)
+    assert forms["a"] == "first"
+
+
+@pytest.mark.parametrize("length", [True, False])
+def test_truncated_body(length, closed):
+    env = environ(BODY[:-20], length=length)
+    if length:
+        env["CONTENT_LENGTH"] = str(len(BODY))
+    with pytest.raises(UnexpectedExit):
+        parse_form_data(env, block_size=7, strict=True)
+    assert [part.name for part in closed] == ["a", "b", "upload"]
+
+    env["wsgi.input"].seek(0)
+    assert parse_form_data(env) == ({}, {})
+
+
+def test_mem_limit():
+    data = body((b"a", b"x" * 600), (b"b", b"y" * 600))
+    parse_form_data(environ(data), mem_limit=1200, strict=True)
+    with pytest.raises(LimitExceeded):
+        parse_form_data(environ(data), mem_limit=1199, strict=True)
+
+
+def test_memfile_limit_spools_to_disk():
+    data = body((b"a", b"x" * 600), (b"b", b"y" * 100))
+    forms, files = parse_form_data(
+        environ(data), mem_limit=200, memfile_limit=500, strict=True
+    )
+    # Spooled to disk, so not counted against mem_limit, and given as a file.
+    assert not files["a"].is_buffered()
+    assert files["a"].raw == b"x" * 600
+    assert forms["b"] == "y" * 100
+
+
+def test_disk_limit(closed):
+    data = body((b"a", b"x" * 600), (b"b", b"y" * 600))
+    parse_form_data(environ(data), disk_limit=1200, strict=True)
+    with pytest.raises(LimitExceeded):
+        parse_form_data(environ(data), disk_limit=1199, strict=True)
+    assert [part.name for part in closed][-2:] == ["a", "b"]
+
+
+@pytest.mark.parametrize("length", [b"abc", b"-1", b"1e3"])
+def test_invalid_part_content_length(length, closed):
+    data = body((b"a", b"1"), part(b"b", b"2", b"Content-Length: %s\r\n" % length))
+    with pytest.raises(MalformedData):
+        parse_form_data(environ(data), block_size=7, strict=True)
+    assert [part.name for part in closed] == ["a"]
+    assert parse_form_data(environ(data)) == ({}, {})
+
+
+def test_invalid_content_length():
+    env = environ(BODY)
+    env["CONTENT_LENGTH"] = "abc"
+    with pytest.raises(MalformedData):
+        parse_form_data(env, strict=True)
+    assert parse_form_data(env) == ({}, {})
+
+
+@pytest.mark.parametrize("length", [True, False])
+def test_urlencoded(length):
+    data = b"a=1&b=caf%C3%A9&a=2"
+    env = environ(data, "application/x-www-form-urlencoded", length=length)
+    forms, files = parse_form_data(env, block_size=3, strict=True)
+    assert forms.getall("a") == ["1", "2"]
+    assert forms["b"] == "caf\xe9"
+    assert files == {}
+
+
+def test_urlencoded_truncated():
+    env = environ(b"a=1&b=2", "application/x-www-form-urlencoded")
+    env["CONTENT_LENGTH"] = "20"
+    with pytest.raises(UnexpectedExit):
+        parse_form_data(env, strict=True)
+
+
+def test_urlencoded_mem_limit():
+    env = environ(b"a=12345&b=12345", "application/x-www-form-urlencoded")
+    with pytest.raises(LimitExceeded):
+        parse_form_data(env, mem_limit=10, strict=True)
+
+
+@pytest.mark.parametrize(
+    "env",
+    [
+        {"REQUEST_METHOD": "GET"},
+        {"REQUEST_METHOD": "POST"},
+        {"REQUEST_METHOD": "POST", "CONTENT_TYPE": "text/plain"},
+        {"REQUEST_METHOD": "POST", "CONTENT_TYPE": "multipart/form-data"},
+    ],
+)
+def test_bad_requests(env):
+    with pytest.raises(MultipartError):
+        parse_form_data(env, strict=True)
+    assert parse_form_data(env) == ({}, {})